@@ -7,7 +7,11 @@ from .settings import (
     LLMConfig,
     SubtitleConfig,
     ProcessingConfig,
-    AppConfig
+    AppConfig,
+    get_env,
+    refresh_env,
+    get_app_config,
+    invalidate
 )
 
 __all__ = [
@@ -15,5 +19,9 @@ __all__ = [
     'LLMConfig',
     'SubtitleConfig',
     'ProcessingConfig',
-    'AppConfig'
+    'AppConfig',
+    'get_env',
+    'refresh_env',
+    'get_app_config',
+    'invalidate'
 ]
@@ -3,40 +3,80 @@ Configuration Settings - Application configuration classes
 """
 
 import os
-import json
-from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 
-@dataclass
+from utils import json_loads, json_dumps
+
+# Environment variables consulted by the application
+_ENV_KEYS = (
+    "OPENAI_API_KEY", "GEMINI_API_KEY", "LLM_API_KEY", "WHISPER_LANGUAGE", "WHISPER_CACHE_DIR", "SUBTITLE_JIT"
+)
+
+# Snapshot of the environment, taken once at import time
+_ENV: Dict[str, Optional[str]] = {key: os.environ.get(key) for key in _ENV_KEYS}
+
+def refresh_env():
+    """Re-read the environment snapshot (e.g. after load_dotenv or in tests)"""
+    _ENV.update({key: os.environ.get(key) for key in _ENV_KEYS})
+
+def get_env(key: str) -> Optional[str]:
+    """Get a value from the environment snapshot"""
+    if key not in _ENV:
+        _ENV[key] = os.environ.get(key)
+    return _ENV[key]
+
+def _section_to_dict(section) -> Dict[str, Any]:
+    """Read the fields of a slotted config section into a dict"""
+    return {name: getattr(section, name) for name in section.__slots__}
+
+@dataclass(slots=True)
 class WhisperConfig:
     """Whisper configuration"""
     model_name: str = "base"  # tiny, base, small, medium, large
     language: Optional[str] = None      # Language code, None for auto-detect
-
-@dataclass
+    backend: str = "faster-whisper"  # faster-whisper, openai or whisper.cpp
+    compute_type: str = "auto"  # faster-whisper: auto, int8, int8_float16, float16, float32
+    device: Optional[str] = None  # cpu or cuda, None to select CUDA when available
+    fp16: bool = True  # Half precision on CUDA (openai backend)
+    enable_model_cache: bool = True  # Reuse loaded models across transcribers in one process
+    parallel_workers: int = 0  # >1 transcribes ~30s chunks concurrently, 0 disables
+    quantization: bool = False  # INT8 dynamic quantization for the openai backend on CPU
+    word_timestamps: bool = False  # Word-level alignment in the transcription JSON; SRT only uses segments
+    vad_filter: bool = True  # Skip silence before decoding (built-in for faster-whisper, Silero otherwise)
+    vad_min_silence_ms: int = 500  # Minimum silence that splits speech regions
+    cache_decoded_audio: bool = False  # Reuse the kept WAV and its decoded waveform (.npy) across runs
+
+@dataclass(slots=True)
 class LLMConfig:
     """LLM configuration"""
     provider: str = "openai"  # openai or gemini
     api_key: Optional[str] = None
     model: str = "gpt-3.5-turbo"  # For OpenAI
     temperature: float = 0.3
+    correction_strategy: str = "sequential"  # sequential, parallel (mind API rate limits), grouped
+    batch_size: int = 10  # Segments per prompt for grouped strategy
+    max_workers: int = 8  # Concurrent requests for parallel strategy
 
-@dataclass
+@dataclass(slots=True)
 class SubtitleConfig:
     """Subtitle configuration"""
     max_chars_per_line: int = 32
     max_lines_per_subtitle: int = 2
     output_format: str = "srt"  # srt, vtt, ass
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingConfig:
     """Processing configuration"""
     enable_llm_correction: bool = True
     keep_temp_files: bool = False
     keep_audio_file: bool = False
+    audio_downsample: bool = True  # Extract 16 kHz mono audio; False keeps original quality
+    stream_segments: bool = False  # Write SRT/NDJSON while transcribing (only without LLM correction)
     output_dir: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """Main application configuration with nested sections"""
     whisper: WhisperConfig = field(default_factory=WhisperConfig)
@@ -103,14 +143,14 @@ class AppConfig:
         # Prefer provider-specific keys; fall back to generic LLM_API_KEY
         if not self.llm.api_key:
             if self.llm.provider == "openai":
-                self.llm.api_key = os.getenv("OPENAI_API_KEY") or os.getenv("LLM_API_KEY")
+                self.llm.api_key = _ENV["OPENAI_API_KEY"] or _ENV["LLM_API_KEY"]
             elif self.llm.provider == "gemini":
-                self.llm.api_key = os.getenv("GEMINI_API_KEY") or os.getenv("LLM_API_KEY")
+                self.llm.api_key = _ENV["GEMINI_API_KEY"] or _ENV["LLM_API_KEY"]
             else:
-                self.llm.api_key = os.getenv("LLM_API_KEY")
+                self.llm.api_key = _ENV["LLM_API_KEY"]
 
         # Optional language override
-        env_lang = os.getenv("WHISPER_LANGUAGE")
+        env_lang = _ENV["WHISPER_LANGUAGE"]
         if env_lang:
             self.whisper.language = env_lang
 
@@ -119,8 +159,7 @@ class AppConfig:
     def from_file(cls, file_path: str) -> 'AppConfig':
         """Load configuration from JSON file (supports nested and legacy flat formats)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data: Dict[str, Any] = json.load(f)
+            data: Dict[str, Any] = json_loads(Path(file_path).read_bytes())
 
             # If already nested
             if isinstance(data.get('whisper'), dict) or isinstance(data.get('llm'), dict):
@@ -135,18 +174,15 @@ class AppConfig:
                     processing=processing_cfg
                 )
             else:
-                # Legacy flat keys mapping
-                whisper_cfg = WhisperConfig(
-                    model_name=data.get('whisper_model', WhisperConfig.model_name),
-                    language=data.get('language')
-                )
-                llm_cfg = LLMConfig(
-                    provider=data.get('llm_provider', LLMConfig.provider),
-                    api_key=data.get('api_key') or data.get('llm_api_key')
-                )
-                processing_cfg = ProcessingConfig(
-                    enable_llm_correction=data.get('enable_correction', ProcessingConfig.enable_llm_correction),
-                    output_dir=data.get('output_dir')
+                # Legacy flat keys mapping (slotted classes have no class-level defaults,
+                # so fall back to the freshly constructed instance's values)
+                whisper_cfg = WhisperConfig(language=data.get('language'))
+                whisper_cfg.model_name = data.get('whisper_model', whisper_cfg.model_name)
+                llm_cfg = LLMConfig(api_key=data.get('api_key') or data.get('llm_api_key'))
+                llm_cfg.provider = data.get('llm_provider', llm_cfg.provider)
+                processing_cfg = ProcessingConfig(output_dir=data.get('output_dir'))
+                processing_cfg.enable_llm_correction = data.get(
+                    'enable_correction', processing_cfg.enable_llm_correction
                 )
                 subtitle_cfg = SubtitleConfig()
                 cfg = cls(
@@ -165,11 +201,47 @@ class AppConfig:
     def to_file(self, file_path: str):
         """Save configuration to JSON file (nested structure)"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(asdict(self), f, indent=2, ensure_ascii=False)
+            Path(file_path).write_bytes(json_dumps(self.to_dict()))
         except Exception as e:
             print(f"Failed to save config to {file_path}: {e}")
 
     def to_dict(self) -> dict:
         """Convert to dictionary"""
-        return asdict(self)
+        # Sections only hold scalars, so a shallow read of each slot replaces asdict's deep copy
+        return {
+            'whisper': _section_to_dict(self.whisper),
+            'llm': _section_to_dict(self.llm),
+            'subtitle': _section_to_dict(self.subtitle),
+            'processing': _section_to_dict(self.processing)
+        }
+
+# Process-wide configuration, built on first use
+_CACHED: Optional[AppConfig] = None
+_CACHED_PATH: Optional[str] = None
+
+def get_app_config(path: Optional[str] = None) -> AppConfig:
+    """
+    Get the shared application configuration
+
+    The configuration is loaded once (from ``path`` if given, otherwise from
+    defaults and the environment) and reused by later calls. Asking for a
+    different ``path`` reloads it.
+
+    Args:
+        path: Optional JSON configuration file path
+
+    Returns:
+        AppConfig: Cached configuration instance
+    """
+    global _CACHED, _CACHED_PATH
+    if _CACHED is None or (path is not None and path != _CACHED_PATH):
+        _CACHED = AppConfig.from_file(path) if path else AppConfig()
+        _CACHED_PATH = path
+    return _CACHED
+
+def invalidate():
+    """Drop the cached configuration and re-read the environment snapshot"""
+    global _CACHED, _CACHED_PATH
+    _CACHED = None
+    _CACHED_PATH = None
+    refresh_env()
@@ -1,18 +1,39 @@
 """
 Core module initialization file
 Contains all core subtitle processing functionality
+
+Classes are imported lazily (PEP 562) so that importing one component does not
+pull in the heavy dependencies (whisper/torch, openai, google-generativeai) of
+the others.
 """
 
-from .audio_extractor import AudioExtractor
-from .whisper_transcriber import WhisperTranscriber
-from .llm_corrector import LLMCorrector
-from .subtitle_generator import SubtitleGenerator
-from .video_processor import VideoProcessor
+import importlib
+
+_LAZY_IMPORTS = {
+    'AudioExtractor': '.audio_extractor',
+    'WhisperTranscriber': '.whisper_transcriber',
+    'LLMCorrector': '.llm_corrector',
+    'SubtitleGenerator': '.subtitle_generator',
+    'SegmentBatch': '.segments',
+    'VideoProcessor': '.video_processor'
+}
 
 __all__ = [
     'AudioExtractor',
     'WhisperTranscriber',
     'LLMCorrector',
     'SubtitleGenerator',
+    'SegmentBatch',
     'VideoProcessor'
 ]
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
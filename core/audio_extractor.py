@@ -1,28 +1,60 @@
 """
 Audio Extractor - Extract audio from video files
-Uses MoviePy to extract audio in WAV format for Whisper processing
+Uses FFmpeg to extract audio in WAV format for Whisper processing
 """
 
 import os
+import json
 import logging
-from moviepy import VideoFileClip
-from typing import Optional
+import subprocess
+import numpy as np
+from pathlib import Path
+from typing import Optional, List
 
 logger = logging.getLogger(__name__)
 
+# Sample rate expected by Whisper
+WHISPER_SAMPLE_RATE = 16000
+
 class AudioExtractor:
     """Extract audio from video files"""
 
     def __init__(self):
         self.supported_formats = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv']
 
-    def extract_audio(self, video_path: str, output_path: Optional[str] = None) -> str:
+    def _run(self, cmd: List[str]) -> bytes:
+        """Run an FFmpeg/FFprobe command and return its stdout"""
+        # No stdin, so a background job is never stopped by SIGTTIN or steals terminal input
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True)
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"{cmd[0]} exited with code {result.returncode}: {stderr}")
+        return result.stdout
+
+    def _check_video(self, video_path: str):
+        """Validate that the video exists and has a supported extension"""
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        file_ext = Path(video_path).suffix.lower()
+        if file_ext not in self.supported_formats:
+            raise ValueError(f"Unsupported video format: {file_ext}")
+
+    def extract_audio(self,
+                      video_path: str,
+                      output_path: Optional[str] = None,
+                      downsample: bool = True) -> str:
         """
         Extract audio from video file
 
+        With ``downsample`` enabled the WAV is written as 16 kHz mono s16, the
+        format Whisper works on, so its ``load_audio`` step no longer has to
+        resample and the file is several times smaller than 48 kHz stereo.
+
         Args:
             video_path: Video file path
             output_path: Output audio file path (optional)
+            downsample: Convert to 16 kHz mono; False keeps source rate and channels
 
         Returns:
             str: Path to extracted audio file
@@ -31,37 +63,74 @@ class AudioExtractor:
             FileNotFoundError: Video file not found
             ValueError: Unsupported video format
         """
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"Video file not found: {video_path}")
-
-        file_ext = os.path.splitext(video_path)[1].lower()
-        if file_ext not in self.supported_formats:
-            raise ValueError(f"Unsupported video format: {file_ext}")
+        self._check_video(video_path)
 
         if output_path is None:
-            base_name = os.path.splitext(os.path.basename(video_path))[0]
-            output_dir = os.path.dirname(video_path)
-            output_path = os.path.join(output_dir, f"{base_name}.wav")
+            output_path = str(Path(video_path).with_suffix('.wav'))
 
+        # Write to a temporary file and move it into place, so an interrupted
+        # run never leaves a truncated WAV at output_path
+        # Absolute paths, so a name starting with "-" is never parsed as an option
+        tmp_path = os.path.abspath(f"{output_path}.part")
         try:
             logger.info(f"Starting audio extraction from {video_path}...")
 
-            # Use MoviePy to extract audio
-            video = VideoFileClip(video_path)
-            audio = video.audio
-
-            # Save as WAV format (well supported by Whisper)
-            # Some moviepy versions do not support 'verbose' kwarg; pass only logger to silence output
-            audio.write_audiofile(output_path, logger=None)
-
-            audio.close()
-            video.close()
+            # Decode the audio stream only and write PCM WAV
+            cmd = [
+                "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-threads", "0",
+                "-i", os.path.abspath(video_path),
+                "-vn", "-acodec", "pcm_s16le", "-sample_fmt", "s16"
+            ]
+            if downsample:
+                cmd += ["-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE)]
+            cmd += ["-f", "wav", tmp_path]
+            self._run(cmd)
+            os.replace(tmp_path, output_path)
 
             logger.info(f"Audio extraction complete: {output_path}")
             return output_path
 
         except Exception as e:
             logger.error(f"Audio extraction failed: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_audio(self, video_path: str) -> np.ndarray:
+        """
+        Decode audio from video file straight into memory
+
+        FFmpeg streams 16 kHz mono s16le PCM over a pipe, so no WAV file is
+        written to or re-read from disk.
+
+        Args:
+            video_path: Video file path
+
+        Returns:
+            np.ndarray: float32 waveform in [-1, 1] sampled at 16 kHz
+
+        Raises:
+            FileNotFoundError: Video file not found
+            ValueError: Unsupported video format
+        """
+        self._check_video(video_path)
+
+        try:
+            logger.info(f"Starting audio decoding from {video_path}...")
+
+            pcm = self._run([
+                "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+                "-i", os.path.abspath(video_path),
+                "-vn", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE),
+                "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1"
+            ])
+            audio = np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+            logger.info(f"Audio decoding complete: {len(audio) / WHISPER_SAMPLE_RATE:.1f} seconds")
+            return audio
+
+        except Exception as e:
+            logger.error(f"Audio decoding failed: {str(e)}")
             raise
 
     def get_video_info(self, video_path: str) -> dict:
@@ -78,14 +147,32 @@ class AudioExtractor:
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
         try:
-            video = VideoFileClip(video_path)
+            output = self._run([
+                "ffprobe", "-v", "quiet", "-print_format", "json",
+                "-show_format", "-show_streams", os.path.abspath(video_path)
+            ])
+            probe = json.loads(output)
+
+            video_stream = next(
+                (stream for stream in probe.get('streams', []) if stream.get('codec_type') == 'video'),
+                {}
+            )
+            fps = None
+            frame_rate = video_stream.get('avg_frame_rate') or video_stream.get('r_frame_rate')
+            if frame_rate and frame_rate != '0/0':
+                num, _, den = frame_rate.partition('/')
+                fps = float(num) / float(den or 1)
+
+            size = None
+            if 'width' in video_stream and 'height' in video_stream:
+                size = [video_stream['width'], video_stream['height']]
+
             info = {
-                'duration': video.duration,
-                'fps': video.fps,
-                'size': video.size,
-                'filename': os.path.basename(video_path)
+                'duration': float(probe.get('format', {}).get('duration', 0.0)),
+                'fps': fps,
+                'size': size,
+                'filename': Path(video_path).name
             }
-            video.close()
             return info
 
         except Exception as e:
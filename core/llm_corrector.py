@@ -3,15 +3,135 @@ LLM Corrector - Correct subtitle errors using Large Language Models
 Supports OpenAI GPT and Google Gemini
 """
 
-import os
+import re
 import logging
-import openai
-import google.generativeai as genai
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+from config.settings import get_env
+
 logger = logging.getLogger(__name__)
 
+# Matches one "N: text" line of a grouped (batched) correction response
+_NUMBERED_LINE_RE = re.compile(r'^\s*(\d+)\s*[:：.、]\s*(.*)$')
+
+GEMINI_MODEL_NAME = 'gemini-2.5-flash'
+
+# Segments shorter than this (after stripping) are returned unchanged
+MIN_CORRECTION_LENGTH = 3
+# Maximum number of corrected texts remembered per corrector
+CORRECTION_CACHE_SIZE = 4096
+# Log correction progress every N segments (and on the last one)
+PROGRESS_LOG_INTERVAL = 10
+
+# ---- Prompt templates (filled with str.format) ----
+
+# Chinese-focused prompt (Simplified by default)
+_ZH_PROMPT = """
+你是專業的字幕校對助手。
+目標語言：中文。
+任務：
+1) 修正常見同音字/錯別字（如：的/地/得，著/着，因/應 等）。
+2) 修正標點（中英文括號、逗號、句號、問號、省略號等），優先使用中文標點。
+3) 改善語法與流暢度，保留原意與口語風格，不過度改寫。
+4) 僅在明顯為語音識別錯誤時移除口頭贅詞（呃、嗯等）。
+5) 保留專有名詞與外文詞彙，不隨意翻譯或改名。
+6) 僅返回「校正後文字」，不輸出任何解釋。
+
+原文：{text}
+{context_block}
+
+校正後："""
+
+# English-focused prompt
+_EN_PROMPT = """
+You are a professional subtitle proofreader.
+Target language: English.
+Tasks:
+1) Fix homophones and common ASR errors (e.g., your/you're, its/it's).
+2) Correct punctuation and capitalization.
+3) Improve grammar and readability while preserving original meaning and speaker intent.
+4) Remove filler words only if they are obvious ASR artifacts.
+5) Keep proper nouns and foreign words, do not translate names.
+6) Return only the corrected text without any explanation.
+
+Original: {text}
+{context_block}
+
+Corrected:"""
+
+# Generic prompt with target language hint
+_GENERIC_PROMPT = """
+You are a subtitle proofreader.
+Target language: {language}.
+Tasks:
+1) Fix homophones and common ASR errors.
+2) Correct punctuation and grammar appropriate for the target language.
+3) Preserve original meaning and tone; avoid over-editing.
+4) Keep proper nouns; do not translate names.
+5) Return only the corrected text without any explanation.
+
+Original: {text}
+{context_block}
+
+Corrected:"""
+
+# Grouped prompts with numbered input lines
+_ZH_BATCH_PROMPT = """
+你是專業的字幕校對助手。
+目標語言：中文。
+以下是依時間順序排列的字幕行（不一定相鄰），每行以編號開頭。
+任務：
+1) 逐行修正同音字/錯別字、標點與語法，保留原意與口語風格，不過度改寫。
+2) 不要合併、拆分或重新排序任何一行。
+3) 以相同的「編號: 文字」格式返回全部 {count} 行，不輸出任何解釋。
+
+{context_block}
+{numbered}
+
+校正後："""
+
+_GENERIC_BATCH_PROMPT = """
+You are a professional subtitle proofreader.
+Target language: {language}.
+The following subtitle lines are in time order (not necessarily adjacent), each prefixed with its number.
+Tasks:
+1) Fix homophones, ASR errors, punctuation and grammar line by line, preserving meaning and tone.
+2) Do not merge, split or reorder lines.
+3) Return all {count} lines in the same "number: text" format without any explanation.
+
+{context_block}
+{numbered}
+
+Corrected:"""
+
+# genai.configure() sets process-global state, so the SDK is configured with one key per process
+_gemini_api_key: Optional[str] = None
+_gemini_lock = threading.Lock()
+
+def _configure_gemini(api_key: str):
+    """Configure the Gemini SDK once, refusing a different key later in the same process"""
+    global _gemini_api_key
+    import google.generativeai as genai
+
+    with _gemini_lock:
+        if _gemini_api_key is None:
+            genai.configure(api_key=api_key)
+            _gemini_api_key = api_key
+        elif api_key != _gemini_api_key:
+            raise ValueError("Gemini is already configured with a different API key in this process")
+
+@lru_cache(maxsize=4)
+def _get_gemini_model(name: str = GEMINI_MODEL_NAME):
+    """Return a cached GenerativeModel instance (call _configure_gemini first)"""
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(name)
+
 @dataclass
 class CorrectionResult:
     """Data class for correction results"""
@@ -23,25 +143,39 @@ class CorrectionResult:
 class LLMCorrector:
     """Use LLM to correct subtitle text"""
 
-    def __init__(self, provider: str = "openai", api_key: Optional[str] = None):
+    def __init__(self,
+                 provider: str = "openai",
+                 api_key: Optional[str] = None,
+                 strategy: str = "sequential",
+                 batch_size: int = 10,
+                 max_workers: int = 8):
         """
         Initialize LLM corrector
 
         Args:
             provider: LLM provider ("openai" or "gemini")
             api_key: API key
+            strategy: Segment dispatch strategy ("sequential", "parallel" or "grouped")
+            batch_size: Number of segments per prompt for the "grouped" strategy
+            max_workers: Number of concurrent requests for the "parallel" strategy
         """
         self.provider = provider.lower()
+        self.strategy = strategy.lower()
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        # LRU of corrected texts; the lock makes it safe for the parallel worker threads
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         # Prefer explicitly provided api_key; fall back to env
-        self.api_key = self._get_api_key()
+        self.api_key = api_key or self._get_api_key()
         self._setup_client()
 
     def _get_api_key(self) -> str:
         """Get API key from environment variables"""
         if self.provider == "openai":
-            return os.getenv("OPENAI_API_KEY")
+            return get_env("OPENAI_API_KEY") or get_env("LLM_API_KEY")
         elif self.provider == "gemini":
-            return os.getenv("GEMINI_API_KEY")
+            return get_env("GEMINI_API_KEY") or get_env("LLM_API_KEY")
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
 
@@ -50,11 +184,24 @@ class LLMCorrector:
         if not self.api_key:
             raise ValueError(f"Cannot find {self.provider.upper()} API key")
 
+        # Provider SDKs are imported here so only the chosen one pays its import cost
         if self.provider == "openai":
-            openai.api_key = self.api_key
+            import httpx
+            import openai
+
+            # Persistent client so keep-alive connections are reused across segments
+            self._openai_client = openai.OpenAI(
+                api_key=self.api_key,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=max(16, self.max_workers),
+                        max_keepalive_connections=max(16, self.max_workers)
+                    )
+                )
+            )
         elif self.provider == "gemini":
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+            _configure_gemini(self.api_key)
+            self.model = _get_gemini_model()
 
     def correct_text(self, text: str, context: str = "", language: str = "zh") -> CorrectionResult:
         """
@@ -68,6 +215,10 @@ class LLMCorrector:
         Returns:
             CorrectionResult: Correction results
         """
+        shortcut = self._short_circuit(text, language)
+        if shortcut is not None:
+            return shortcut
+
         prompt = self._build_correction_prompt(text, context, language)
 
         try:
@@ -78,6 +229,7 @@ class LLMCorrector:
             else:
                 raise ValueError(f"Unsupported provider: {self.provider}")
 
+            self._remember(text, language, corrected)
             return self._parse_correction_result(text, corrected)
 
         except Exception as e:
@@ -89,71 +241,87 @@ class LLMCorrector:
                 corrections_made=[]
             )
 
+    def _short_circuit(self, text: str, language: str) -> Optional[CorrectionResult]:
+        """Return a result without calling the LLM for trivial or already-corrected text"""
+        if len(text.strip()) < MIN_CORRECTION_LENGTH:
+            return CorrectionResult(
+                original_text=text,
+                corrected_text=text,
+                confidence=1.0,
+                corrections_made=[]
+            )
+
+        key = (language, text)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            return self._parse_correction_result(text, cached)
+        return None
+
+    def _remember(self, text: str, language: str, corrected: str):
+        """Store a successful correction, evicting the least recently used entry when full"""
+        key = (language, text)
+        with self._cache_lock:
+            self._cache[key] = corrected
+            self._cache.move_to_end(key)
+            if len(self._cache) > CORRECTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
     def _build_correction_prompt(self, text: str, context: str = "", language: str = "zh") -> str:
         """Build correction prompt based on language"""
         lang = (language or "").lower()
 
         if lang.startswith("zh"):
-            # Chinese-focused prompt (Simplified by default)
-            base_prompt = f"""
-你是專業的字幕校對助手。
-目標語言：中文。
-任務：
-1) 修正常見同音字/錯別字（如：的/地/得，著/着，因/應 等）。
-2) 修正標點（中英文括號、逗號、句號、問號、省略號等），優先使用中文標點。
-3) 改善語法與流暢度，保留原意與口語風格，不過度改寫。
-4) 僅在明顯為語音識別錯誤時移除口頭贅詞（呃、嗯等）。
-5) 保留專有名詞與外文詞彙，不隨意翻譯或改名。
-6) 僅返回「校正後文字」，不輸出任何解釋。
-
-原文：{text}
-{f"上下文：{context}" if context else ""}
-
-校正後："""
+            return _ZH_PROMPT.format(text=text, context_block=f"上下文：{context}" if context else "")
         elif lang.startswith("en"):
-            # English-focused prompt
-            base_prompt = f"""
-You are a professional subtitle proofreader.
-Target language: English.
-Tasks:
-1) Fix homophones and common ASR errors (e.g., your/you're, its/it's).
-2) Correct punctuation and capitalization.
-3) Improve grammar and readability while preserving original meaning and speaker intent.
-4) Remove filler words only if they are obvious ASR artifacts.
-5) Keep proper nouns and foreign words, do not translate names.
-6) Return only the corrected text without any explanation.
-
-Original: {text}
-{f"Context: {context}" if context else ""}
-
-Corrected:"""
-        else:
-            # Generic prompt with target language hint
-            base_prompt = f"""
-You are a subtitle proofreader.
-Target language: {language}.
-Tasks:
-1) Fix homophones and common ASR errors.
-2) Correct punctuation and grammar appropriate for the target language.
-3) Preserve original meaning and tone; avoid over-editing.
-4) Keep proper nouns; do not translate names.
-5) Return only the corrected text without any explanation.
+            return _EN_PROMPT.format(text=text, context_block=f"Context: {context}" if context else "")
+        return _GENERIC_PROMPT.format(
+            text=text,
+            language=language,
+            context_block=f"Context: {context}" if context else ""
+        )
 
-Original: {text}
-{f"Context: {context}" if context else ""}
+    def _build_batch_prompt(self, texts: List[str], context: str = "", language: str = "zh") -> str:
+        """Build a grouped correction prompt with numbered input lines"""
+        lang = (language or "").lower()
+        numbered = "\n".join(f"{i + 1}: {text}" for i, text in enumerate(texts))
 
-Corrected:"""
-        return base_prompt
+        if lang.startswith("zh"):
+            return _ZH_BATCH_PROMPT.format(
+                count=len(texts),
+                numbered=numbered,
+                context_block=f"上下文：{context}" if context else ""
+            )
+        return _GENERIC_BATCH_PROMPT.format(
+            count=len(texts),
+            numbered=numbered,
+            language=language,
+            context_block=f"Context: {context}" if context else ""
+        )
 
-    def _correct_with_openai(self, prompt: str) -> str:
+    def _parse_batch_response(self, response: str, count: int) -> Dict[int, str]:
+        """Parse a numbered batch response into {index: corrected_text}"""
+        parsed = {}
+        for line in response.splitlines():
+            match = _NUMBERED_LINE_RE.match(line)
+            if not match:
+                continue
+            index = int(match.group(1)) - 1
+            if 0 <= index < count and index not in parsed:
+                parsed[index] = match.group(2).strip()
+        return parsed
+
+    def _correct_with_openai(self, prompt: str, max_tokens: int = 200) -> str:
         """Correct using OpenAI API"""
-        response = openai.ChatCompletion.create(
+        response = self._openai_client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a professional text correction assistant, specializing in correcting speech-to-text errors."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=200,
+            max_tokens=max_tokens,
             temperature=0.3
         )
         return response.choices[0].message.content.strip()
@@ -178,10 +346,63 @@ Corrected:"""
             corrections_made=corrections_made
         )
 
+    def _format_context(self, prev_text: str, next_text: str) -> str:
+        """Build context string from neighbouring segment texts"""
+        context_parts = []
+        if prev_text:
+            context_parts.append(f"Previous: {prev_text}")
+        if next_text:
+            context_parts.append(f"Next: {next_text}")
+        return " ".join(context_parts)
+
+    def _correct_group(self,
+                       texts: List[str],
+                       contexts: List[str],
+                       group_context: str,
+                       language: str) -> List[CorrectionResult]:
+        """
+        Correct a group of segments (in time order) with a single prompt
+
+        Lines missing from the response are retried individually with their
+        precomputed per-segment context.
+        """
+        prompt = self._build_batch_prompt(texts, group_context, language)
+        max_tokens = 200 * len(texts)
+
+        try:
+            if self.provider == "openai":
+                response = self._correct_with_openai(prompt, max_tokens=max_tokens)
+            elif self.provider == "gemini":
+                response = self._correct_with_gemini(prompt)
+            else:
+                raise ValueError(f"Unsupported provider: {self.provider}")
+        except Exception as e:
+            logger.error(f"Batch correction failed: {str(e)}")
+            return [
+                CorrectionResult(original_text=text, corrected_text=text, confidence=0.0, corrections_made=[])
+                for text in texts
+            ]
+
+        parsed = self._parse_batch_response(response, len(texts))
+        results = []
+        for i, (text, context) in enumerate(zip(texts, contexts)):
+            if i in parsed and parsed[i]:
+                self._remember(text, language, parsed[i])
+                results.append(self._parse_correction_result(text, parsed[i]))
+            else:
+                logger.warning(f"Batch response missing line {i + 1}, retrying individually")
+                results.append(self.correct_text(text, context, language=language))
+        return results
+
     def correct_segments(self, segments: List[Dict], language: str = "zh") -> List[Dict]:
         """
         Correct subtitle segments
 
+        Segments are dispatched according to ``self.strategy``:
+        "sequential" sends one request per segment, "parallel" sends one request
+        per segment across a thread pool, and "grouped" packs ``batch_size``
+        segments into a single numbered prompt.
+
         Args:
             segments: List of subtitle segments
             language: ISO language code to guide prompts
@@ -189,28 +410,57 @@ Corrected:"""
         Returns:
             List[Dict]: List of corrected segments
         """
-        corrected_segments = []
-
-        for i, segment in enumerate(segments):
-            text = segment.get('text', '')
-
-            # Build context from previous and next segments
-            context_parts = []
-            if i > 0:
-                context_parts.append(f"Previous: {segments[i-1].get('text', '')}")
-            if i < len(segments) - 1:
-                context_parts.append(f"Next: {segments[i+1].get('text', '')}")
-
-            context = " ".join(context_parts)
+        texts = [segment.get('text', '') for segment in segments]
+        total = len(texts)
+
+        # Neighbour texts, dropping a neighbour identical to the segment itself
+        # (Whisper often repeats lines) so duplicates share one cache entry
+        prevs = [prev if prev != text else "" for prev, text in zip([""] + texts[:-1], texts)]
+        nexts = [nxt if nxt != text else "" for text, nxt in zip(texts, texts[1:] + [""])]
+        # Context strings are built once and shared by the batch and retry paths
+        contexts = [self._format_context(prev, nxt) for prev, nxt in zip(prevs, nexts)]
+
+        if self.strategy == "grouped":
+            # Resolve trivial and cached segments up front so they never enter a prompt
+            results = [self._short_circuit(text, language) for text in texts]
+            pending = [i for i, result in enumerate(results) if result is None]
+            for start in range(0, len(pending), self.batch_size):
+                group = pending[start:start + self.batch_size]
+                group_results = self._correct_group(
+                    [texts[i] for i in group],
+                    [contexts[i] for i in group],
+                    self._format_context(prevs[group[0]], nexts[group[-1]]),
+                    language
+                )
+                for i, result in zip(group, group_results):
+                    results[i] = result
+        elif self.strategy in ("parallel", "sequential"):
+            def correct(text: str, context: str) -> CorrectionResult:
+                return self.correct_text(text, context, language=language)
+
+            if self.strategy == "parallel" and total > 1:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    results = list(executor.map(correct, texts, contexts))
+            else:
+                results = [correct(text, context) for text, context in zip(texts, contexts)]
+        else:
+            raise ValueError(f"Unsupported correction strategy: {self.strategy}")
 
-            correction_result = self.correct_text(text, context, language=language)
+        # Failed requests (e.g. rate limits) keep the original text with confidence 0.0
+        failed = sum(1 for result in results if result.confidence == 0.0)
+        if failed:
+            logger.warning(f"{failed}/{total} segments could not be corrected and keep their original text")
 
+        corrected_segments = []
+        log_progress = logger.isEnabledFor(logging.INFO)
+        for i, (segment, correction_result) in enumerate(zip(segments, results)):
             corrected_segment = segment.copy()
             corrected_segment['text'] = correction_result.corrected_text
             corrected_segment['original_text'] = correction_result.original_text
             corrected_segment['correction_confidence'] = correction_result.confidence
 
             corrected_segments.append(corrected_segment)
-            logger.info(f"Corrected segment {i+1}/{len(segments)}: {text[:30]}...")
+            if log_progress and (i % PROGRESS_LOG_INTERVAL == 0 or i == total - 1):
+                logger.info("Corrected segment %d/%d: %.30s...", i + 1, total, texts[i])
 
         return corrected_segments
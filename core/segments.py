@@ -0,0 +1,79 @@
+"""
+Segment Batch - Column-oriented (structure of arrays) storage for subtitle segments
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Dict, Iterable, Optional
+
+@dataclass(slots=True)
+class SegmentBatch:
+    """Subtitle segments stored as one array per field"""
+    starts: np.ndarray  # float64 seconds
+    ends: np.ndarray  # float64 seconds
+    ids: np.ndarray  # int32
+    texts: List[str]
+
+    @classmethod
+    def from_whisper(cls, transcription_result: Dict) -> 'SegmentBatch':
+        """
+        Build a batch from Whisper transcription results in a single pass
+
+        Args:
+            transcription_result: Whisper transcription results
+
+        Returns:
+            SegmentBatch: Segment batch with stripped texts
+        """
+        return cls.from_dicts(transcription_result['segments'], strip=True)
+
+    @classmethod
+    def from_dicts(cls, segments: Iterable[Dict], strip: bool = False) -> 'SegmentBatch':
+        """
+        Build a batch from segment dicts with start/end/text/id keys
+
+        Args:
+            segments: Segment dicts
+            strip: Strip whitespace from texts
+
+        Returns:
+            SegmentBatch: Segment batch
+        """
+        segments = segments if isinstance(segments, list) else list(segments)
+        count = len(segments)
+        # Timestamps stay float64: float32 cannot resolve milliseconds past a few hours
+        starts = np.empty(count, dtype=np.float64)
+        ends = np.empty(count, dtype=np.float64)
+        ids = np.empty(count, dtype=np.int32)
+        texts = []
+
+        for i, segment in enumerate(segments):
+            starts[i] = segment.get('start', 0)
+            ends[i] = segment.get('end', 0)
+            ids[i] = segment.get('id', i)
+            text = segment.get('text', '')
+            texts.append(text.strip() if strip else text)
+
+        return cls(starts, ends, ids, texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def to_list_of_dicts(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Convert to the list-of-dicts segment format used by extract_segments
+
+        Args:
+            limit: Convert only the first ``limit`` segments
+
+        Returns:
+            List[Dict]: List of segment information
+        """
+        count = len(self) if limit is None else min(limit, len(self))
+        return [
+            {'start': start, 'end': end, 'text': text, 'id': segment_id}
+            for start, end, text, segment_id in zip(
+                self.starts[:count].tolist(), self.ends[:count].tolist(),
+                self.texts[:count], self.ids[:count].tolist()
+            )
+        ]
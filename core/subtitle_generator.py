@@ -2,56 +2,140 @@
 Subtitle Generator - Generate SRT subtitle files from transcribed and corrected text
 """
 
-import os
+import re
 import logging
-import pysrt
-import json
-from typing import List, Dict
-from datetime import timedelta
+import unicodedata
+import numpy as np
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Dict, NamedTuple, Optional, Tuple, Union
+
+from config.settings import get_env
+from utils import _text_jit
+from .segments import SegmentBatch
 
 logger = logging.getLogger(__name__)
 
+# CJK ideographs, kana and hangul can be broken between any two characters
+_CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+# CJK/fullwidth punctuation stays attached to the preceding token
+_CJK_PUNCT = '\u3000-\u303f\uff00-\uffef'
+# Leading whitespace + one breakable token (a CJK character or a space-delimited word)
+_TOKEN_RE = re.compile(
+    rf'(\s*)([{_CJK_CHARS}][{_CJK_PUNCT}]*'
+    rf'|[^\s{_CJK_CHARS}{_CJK_PUNCT}]+[{_CJK_PUNCT}]*'
+    rf'|[{_CJK_PUNCT}]+)'
+)
+
+_SRT_TIME_FORMAT = "%02d:%02d:%02d,%03d"
+
+# One SRT block: index, "start --> end" timing line, then text up to a blank line or EOF
+_SRT_BLOCK_RE = re.compile(
+    rb"^\d+\r?\n\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}\r?\n.+?(?:\r?\n\r?\n|\Z)",
+    re.M | re.S
+)
+
+class SrtTime(NamedTuple):
+    """SRT timestamp components"""
+    hours: int
+    minutes: int
+    seconds: int
+    milliseconds: int
+
+    def __str__(self) -> str:
+        return _SRT_TIME_FORMAT % self
+
+@lru_cache(maxsize=4096)
+def _display_width(token: str) -> int:
+    """Display width of a token, counting fullwidth/wide characters as 2 columns"""
+    return sum(2 if unicodedata.east_asian_width(ch) in ('F', 'W') else 1 for ch in token)
+
+@lru_cache(maxsize=1)
+def _char_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Class flags and display widths for every BMP code point, built on first use"""
+    bmp = np.arange(0x10000, dtype=np.uint32).tobytes().decode('utf-32-le', 'surrogatepass')
+
+    classes = np.zeros(0x10000, dtype=np.uint8)
+    for char_class, flag in ((r'\s', _text_jit.WHITESPACE), (_CJK_CHARS, _text_jit.CJK), (_CJK_PUNCT, _text_jit.PUNCT)):
+        # Each class is a few contiguous code point runs, so mark whole runs at once
+        for match in re.finditer(f'[{char_class}]+', bmp):
+            classes[match.start():match.end()] |= flag
+
+    east_asian_width = np.array(list(map(unicodedata.east_asian_width, bmp)))
+    widths = np.where((east_asian_width == 'F') | (east_asian_width == 'W'), 2, 1).astype(np.int32)
+    return classes, widths
+
 class SubtitleGenerator:
     """Generate SRT format subtitle files"""
 
     def __init__(self):
         self.max_chars_per_line = 32  # Maximum characters per line
         self.max_lines_per_subtitle = 2  # Maximum lines per subtitle
+        # Compiled line-wrapping kernel with SUBTITLE_JIT=1: the AOT build if present, else numba JIT
+        self._wrap_kernel = _text_jit.load_wrap_lines(get_env("SUBTITLE_JIT") == "1")
 
-    def generate_srt(self, segments: List[Dict], output_path: str) -> str:
+    def generate_srt(self, segments: Union[List[Dict], SegmentBatch], output_path: str) -> str:
         """
         Generate SRT subtitle file
 
         Args:
-            segments: List of subtitle segments
+            segments: List of subtitle segments or a SegmentBatch
             output_path: Output SRT file path
 
         Returns:
             str: Path to generated SRT file
         """
         try:
-            subs = pysrt.SubRipFile()
-
-            for i, segment in enumerate(segments):
-                text = segment.get('text', '').strip()
-                if not text:
-                    continue
+            batch = segments if isinstance(segments, SegmentBatch) else SegmentBatch.from_dicts(segments)
+            cues = []
+            for text, start, end in zip(batch.texts, batch.starts.tolist(), batch.ends.tolist()):
+                text = text.strip()
+                if text:
+                    cues.extend(self._split_cues(text, start, end))
+
+            count = len(cues)
+            start_stamps, end_stamps = self._format_times_bulk(
+                np.fromiter((start for _, start, _ in cues), dtype=np.float64, count=count),
+                np.fromiter((end for _, _, end in cues), dtype=np.float64, count=count)
+            )
+
+            blocks = []
+            for index, (cue_text, _, _) in enumerate(cues):
+                blocks.append(f"{index + 1}\n{start_stamps[index]} --> {end_stamps[index]}\n{cue_text}\n\n")
+
+            # Save SRT file in a single write
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write("".join(blocks))
+            logger.info(f"SRT subtitle file generated: {output_path}")
+            return output_path
 
-                formatted_text = self._format_subtitle_text(text)
-                start_time = self._seconds_to_srt_time(segment.get('start', 0))
-                end_time = self._seconds_to_srt_time(segment.get('end', 0))
+        except Exception as e:
+            logger.error(f"Failed to generate SRT file: {str(e)}")
+            raise
 
-                subtitle_item = pysrt.SubRipItem(
-                    index=i + 1,
-                    start=start_time,
-                    end=end_time,
-                    text=formatted_text
-                )
+    def write_srt_stream(self, segments: Iterable[Dict], output_path: str) -> str:
+        """
+        Write an SRT file block by block as segments arrive
 
-                subs.append(subtitle_item)
+        Args:
+            segments: Iterable of subtitle segments
+            output_path: Output SRT file path
 
-            # Save SRT file
-            subs.save(output_path, encoding='utf-8')
+        Returns:
+            str: Path to generated SRT file
+        """
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                index = 0
+                for segment in segments:
+                    text = segment.get('text', '').strip()
+                    if not text:
+                        continue
+                    for cue_text, start, end in self._split_cues(text, segment.get('start', 0), segment.get('end', 0)):
+                        index += 1
+                        start_time = self._format_srt_time(start)
+                        end_time = self._format_srt_time(end)
+                        f.write(f"{index}\n{start_time} --> {end_time}\n{cue_text}\n\n")
             logger.info(f"SRT subtitle file generated: {output_path}")
             return output_path
 
@@ -59,37 +143,129 @@ class SubtitleGenerator:
             logger.error(f"Failed to generate SRT file: {str(e)}")
             raise
 
+    def _format_times_bulk(self, starts: np.ndarray, ends: np.ndarray) -> Tuple[List[str], List[str]]:
+        """
+        Convert arrays of start/end seconds to SRT timestamps in one vectorized pass
+
+        Args:
+            starts: Start times in seconds
+            ends: End times in seconds
+
+        Returns:
+            Tuple[List[str], List[str]]: Start and end timestamps (HH:MM:SS,mmm)
+        """
+        count = len(starts)
+        times = np.empty((2, count), dtype=np.float64)
+        times[0] = starts
+        times[1] = ends
+        total_ms = np.rint(np.maximum(times, 0) * 1000).astype(np.int64)
+        hours, remainder = np.divmod(total_ms, 3_600_000)
+        minutes, remainder = np.divmod(remainder, 60_000)
+        secs, millis = np.divmod(remainder, 1000)
+        stamps = [
+            _SRT_TIME_FORMAT % parts
+            for parts in zip(hours.ravel().tolist(), minutes.ravel().tolist(),
+                             secs.ravel().tolist(), millis.ravel().tolist())
+        ]
+        return stamps[:count], stamps[count:]
+
+    def _split_cues(self, text: str, start: float, end: float) -> List[Tuple[str, float, float]]:
+        """
+        Split one segment into cues of at most ``max_lines_per_subtitle`` lines
+
+        Text that does not fit in one cue continues in the next; the segment's
+        time range is shared out in proportion to each cue's character count.
+
+        Args:
+            text: Segment text
+            start: Segment start time in seconds
+            end: Segment end time in seconds
+
+        Returns:
+            List[Tuple[str, float, float]]: (cue text, start, end) for each cue
+        """
+        lines = self._format_subtitle_text(text).split("\n")
+        max_lines = max(self.max_lines_per_subtitle, 1)
+        if len(lines) <= max_lines:
+            return [("\n".join(lines), start, end)]
+
+        groups = [lines[i:i + max_lines] for i in range(0, len(lines), max_lines)]
+        weights = [sum(len(line) for line in group) for group in groups]
+        total = sum(weights) or len(groups)
+
+        cues = []
+        elapsed = 0
+        cue_start = start
+        for group, weight in zip(groups, weights):
+            elapsed += weight
+            cue_end = start + (end - start) * elapsed / total
+            cues.append(("\n".join(group), cue_start, cue_end))
+            cue_start = cue_end
+        return cues
+
     def _format_subtitle_text(self, text: str) -> str:
         """
         Format subtitle text with line breaks
 
+        Line length is measured in display columns, so fullwidth CJK
+        characters count as two. Every token is kept; lines beyond
+        ``max_lines_per_subtitle`` are split into further cues by _split_cues.
+
         Args:
             text: Original text
 
         Returns:
             str: Formatted text
         """
-        words = text.split()
-        lines = []
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if len(test_line) <= self.max_chars_per_line:
-                current_line = test_line
+        if self._wrap_kernel is not None:
+            return self._format_subtitle_text_jit(text)
+
+        max_chars = self.max_chars_per_line
+        lines: List[List[str]] = []
+        current_line: List[str] = []
+        current_len = 0
+
+        # Greedy packing on a running display width; CJK text is broken per character
+        for match in _TOKEN_RE.finditer(text):
+            spaced, token = match.groups()
+            width = _display_width(token)
+            separator = " " if current_line and spaced else ""
+            needed = width + len(separator)
+            if current_len + needed <= max_chars:
+                if separator:
+                    current_line.append(separator)
+                current_line.append(token)
+                current_len += needed
             else:
                 if current_line:
                     lines.append(current_line)
-                current_line = word
-                if len(lines) >= self.max_lines_per_subtitle:
-                    break
+                current_line = [token]
+                current_len = width
 
-        if current_line and len(lines) < self.max_lines_per_subtitle:
+        if current_line:
             lines.append(current_line)
 
-        return "\n".join(lines)
+        return "\n".join("".join(line) for line in lines)
+
+    def _format_subtitle_text_jit(self, text: str) -> str:
+        """Same layout as _format_subtitle_text, computed by the wrap_lines kernel"""
+        codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        class_table, width_table = _char_tables()
+        bmp = np.minimum(codepoints, 0xFFFF)
+        classes = class_table[bmp]
+        widths = width_table[bmp]
+
+        # Characters outside the BMP are word characters; look up their widths individually
+        astral = np.flatnonzero(codepoints > 0xFFFF)
+        if astral.size:
+            classes[astral] = 0
+            widths[astral] = [_display_width(chr(cp)) for cp in codepoints[astral].tolist()]
 
-    def _seconds_to_srt_time(self, seconds: float) -> pysrt.SubRipTime:
+        wrap_lines = self._wrap_kernel or _text_jit._wrap_lines
+        wrapped = wrap_lines(codepoints, classes, widths, self.max_chars_per_line)
+        return wrapped.tobytes().decode('utf-32-le')
+
+    def _seconds_to_srt_time(self, seconds: float) -> SrtTime:
         """
         Convert seconds to SRT time format
 
@@ -97,33 +273,45 @@ class SubtitleGenerator:
             seconds: Number of seconds
 
         Returns:
-            pysrt.SubRipTime: SRT time object
+            SrtTime: SRT time components
+        """
+        total_ms = max(0, int(round(seconds * 1000)))
+        hours, remainder = divmod(total_ms, 3_600_000)
+        minutes, remainder = divmod(remainder, 60_000)
+        seconds, milliseconds = divmod(remainder, 1000)
+        return SrtTime(hours, minutes, seconds, milliseconds)
+
+    def _format_srt_time(self, seconds: float) -> str:
         """
-        td = timedelta(seconds=seconds)
-        total_seconds = int(td.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        milliseconds = int((td.total_seconds() - total_seconds) * 1000)
+        Format seconds as an SRT timestamp string (HH:MM:SS,mmm)
+
+        Args:
+            seconds: Number of seconds
 
-        return pysrt.SubRipTime(
-            hours=hours,
-            minutes=minutes,
-            seconds=seconds,
-            milliseconds=milliseconds
-        )
+        Returns:
+            str: SRT timestamp
+        """
+        return _SRT_TIME_FORMAT % self._seconds_to_srt_time(seconds)
 
-    def preview_subtitles(self, segments: List[Dict], num_items: int = 5) -> str:
+    def preview_subtitles(self,
+                          segments: Union[List[Dict], SegmentBatch],
+                          num_items: int = 5,
+                          total: Optional[int] = None) -> str:
         """
         Generate subtitle preview
 
         Args:
-            segments: List of subtitle segments
+            segments: List of subtitle segments or a SegmentBatch
             num_items: Number of preview items
+            total: Total number of segments when only the first ones are passed
 
         Returns:
             str: Preview text
         """
+        total = len(segments) if total is None else total
+        if isinstance(segments, SegmentBatch):
+            segments = segments.to_list_of_dicts(num_items)
+
         preview_lines = []
         preview_lines.append("=== Subtitle Preview ===")
 
@@ -137,8 +325,8 @@ class SubtitleGenerator:
 
             preview_lines.append(f"{i+1}. [{start_str} - {end_str}] {text}")
 
-        if len(segments) > num_items:
-            preview_lines.append(f"... and {len(segments) - num_items} more subtitle items")
+        if total > num_items:
+            preview_lines.append(f"... and {total - num_items} more subtitle items")
 
         return "\n".join(preview_lines)
 
@@ -153,8 +341,13 @@ class SubtitleGenerator:
             bool: Whether the file is valid
         """
         try:
-            subs = pysrt.open(srt_path, encoding='utf-8')
-            logger.info(f"SRT file validation successful, {len(subs)} subtitle items")
+            data = Path(srt_path).read_bytes()
+            count = len(_SRT_BLOCK_RE.findall(data))
+            if count == 0:
+                logger.error(f"SRT file validation failed: no subtitle blocks found in {srt_path}")
+                return False
+
+            logger.info(f"SRT file validation successful, {count} subtitle items")
             return True
 
         except Exception as e:
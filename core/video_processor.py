@@ -5,13 +5,17 @@ Coordinates audio extraction, transcription, LLM correction, and subtitle genera
 
 import os
 import sys
+import shutil
 import logging
-from typing import Optional, Dict, List
+from pathlib import Path
+from typing import Optional, Dict, Iterable, Iterator, List, Union
 
 from .audio_extractor import AudioExtractor
 from .whisper_transcriber import WhisperTranscriber
 from .llm_corrector import LLMCorrector
 from .subtitle_generator import SubtitleGenerator
+from .segments import SegmentBatch
+from config.settings import AppConfig, get_app_config
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +25,8 @@ class VideoProcessor:
     def __init__(self,
                  whisper_model: str = "base",
                  llm_provider: str = "openai",
-                 llm_api_key: Optional[str] = None):
+                 llm_api_key: Optional[str] = None,
+                 config: Optional[AppConfig] = None):
         """
         Initialize video processor
 
@@ -29,20 +34,44 @@ class VideoProcessor:
             whisper_model: Whisper model name
             llm_provider: LLM provider
             llm_api_key: LLM API key
+            config: Application configuration (default: shared get_app_config())
         """
+        self.config = config or get_app_config()
         self.audio_extractor = AudioExtractor()
-        self.transcriber = WhisperTranscriber(whisper_model)
-        self.corrector = LLMCorrector(llm_provider, llm_api_key)
+        self.transcriber = WhisperTranscriber(
+            whisper_model,
+            backend=self.config.whisper.backend,
+            compute_type=self.config.whisper.compute_type,
+            device=self.config.whisper.device,
+            fp16=self.config.whisper.fp16,
+            enable_model_cache=self.config.whisper.enable_model_cache,
+            num_workers=max(1, self.config.whisper.parallel_workers),
+            quantization=self.config.whisper.quantization,
+            vad_filter=self.config.whisper.vad_filter,
+            vad_min_silence_ms=self.config.whisper.vad_min_silence_ms,
+            cache_decoded_audio=self.config.whisper.cache_decoded_audio
+        )
+        self.corrector = LLMCorrector(
+            llm_provider,
+            llm_api_key,
+            strategy=self.config.llm.correction_strategy,
+            batch_size=self.config.llm.batch_size,
+            max_workers=self.config.llm.max_workers
+        )
         self.subtitle_generator = SubtitleGenerator()
 
         logger.info("Video processor initialization complete")
 
-    def _write_segments_txt(self, segments: List[Dict], output_path: str) -> str:
+    def _write_segments_txt(self, segments: Union[List[Dict], SegmentBatch], output_path: str) -> str:
         """Write plain text file with one segment per line."""
         try:
+            if isinstance(segments, SegmentBatch):
+                texts = segments.texts
+            else:
+                texts = (seg.get('text') or '' for seg in segments)
             lines = []
-            for seg in segments:
-                text = (seg.get('text') or '').strip()
+            for text in texts:
+                text = text.strip()
                 if text:
                     lines.append(text)
             content = "\n".join(lines)
@@ -54,6 +83,30 @@ class VideoProcessor:
             logger.warning(f"Failed to write text file {output_path}: {str(e)}")
             return output_path
 
+    def _tee_segments_txt(self, segments: Iterable[Dict], output_path: str) -> Iterator[Dict]:
+        """Write one segment per line to a text file while passing segments through."""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            first = True
+            for seg in segments:
+                text = (seg.get('text') or '').strip()
+                if text:
+                    f.write(text if first else f"\n{text}")
+                    first = False
+                yield seg
+        logger.info(f"Text file generated: {output_path}")
+
+    def _copy_text_file(self, src_path: str, dst_path: str) -> str:
+        """Copy src to dst; a hard link would let later in-place writes to one clobber the other."""
+        try:
+            # Drop any existing dst first so a link left by an earlier run is broken, not written through
+            if os.path.exists(dst_path):
+                os.remove(dst_path)
+            shutil.copyfile(src_path, dst_path)
+            logger.info(f"Text file generated: {dst_path}")
+        except Exception as e:
+            logger.warning(f"Failed to write text file {dst_path}: {str(e)}")
+        return dst_path
+
     def process_video(self,
                      video_path: str,
                      output_dir: Optional[str] = None,
@@ -74,11 +127,13 @@ class VideoProcessor:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
+        video = Path(video_path)
         if output_dir is None:
-            output_dir = os.path.dirname(video_path)
+            output_dir = str(video.parent)
 
-        os.makedirs(output_dir, exist_ok=True)
-        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        out_dir = Path(output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base_name = video.stem
 
         result_paths = {
             'video': video_path,
@@ -88,39 +143,77 @@ class VideoProcessor:
         try:
             # Step 1: Extract audio
             logger.info("=== Step 1: Extract Audio ===")
-            audio_path = os.path.join(output_dir, f"{base_name}.wav")
-            audio_path = self.audio_extractor.extract_audio(video_path, audio_path)
-            result_paths['audio'] = audio_path
+            processing = self.config.processing
+            if processing.keep_audio_file or processing.keep_temp_files:
+                # Materialize the WAV only when the user wants to keep it
+                audio_path = str(out_dir / f"{base_name}.wav")
+                cache_audio = self.config.whisper.cache_decoded_audio
+                if (cache_audio and os.path.exists(audio_path)
+                        and os.path.getmtime(audio_path) >= os.path.getmtime(video_path)):
+                    # extract_audio moves the WAV into place only once complete, so an existing one is whole;
+                    # re-extracting would make it newer than its decoded-waveform cache
+                    logger.info(f"Reusing extracted audio: {audio_path}")
+                else:
+                    audio_path = self.audio_extractor.extract_audio(
+                        video_path,
+                        audio_path,
+                        downsample=processing.audio_downsample
+                    )
+                result_paths['audio'] = audio_path
+                if cache_audio:
+                    result_paths['decoded_audio'] = self.transcriber.decoded_audio_cache_path(audio_path)
+                audio = audio_path
+            else:
+                audio = self.audio_extractor.load_audio(video_path)
 
             # Step 2: Speech to text
             logger.info("=== Step 2: Speech to Text ===")
-            transcription = self.transcriber.transcribe_audio(audio_path, language)
-            segments = self.transcriber.extract_segments(transcription)
+            if processing.stream_segments:
+                if not enable_correction:
+                    return self._process_streaming(audio, language, out_dir, base_name, result_paths)
+                logger.info("LLM correction needs every segment; buffering the transcription")
+
+            workers = self.config.whisper.parallel_workers
+            word_timestamps = self.config.whisper.word_timestamps
+            if workers > 1:
+                transcription = self.transcriber.transcribe_audio_parallel(
+                    audio, language, workers=workers, word_timestamps=word_timestamps
+                )
+            else:
+                transcription = self.transcriber.transcribe_audio(audio, language, word_timestamps)
 
-            transcription_path = os.path.join(output_dir, f"{base_name}_transcription.json")
+            transcription_path = str(out_dir / f"{base_name}_transcription.json")
             self.transcriber.save_transcription(transcription, transcription_path)
             result_paths['transcription'] = transcription_path
 
-            # Write pre-LLM plain text
-            pre_txt_path = os.path.join(output_dir, f"{base_name}_pre_llm.txt")
-            self._write_segments_txt(segments, pre_txt_path)
-            result_paths['pre_llm_txt'] = pre_txt_path
+            pre_txt_path = str(out_dir / f"{base_name}_pre_llm.txt")
+            post_txt_path = str(out_dir / f"{base_name}_post_llm.txt")
 
             # Step 3: LLM correction (if enabled)
             if enable_correction:
+                segments = self.transcriber.extract_segments(transcription)
+                # Pre-LLM text is an intermediate artifact once correction runs
+                if processing.keep_temp_files:
+                    self._write_segments_txt(segments, pre_txt_path)
+                    result_paths['pre_llm_txt'] = pre_txt_path
+
                 logger.info("=== Step 3: LLM Subtitle Correction ===")
                 segments = self.corrector.correct_segments(segments, language=language)
+                self._write_segments_txt(segments, post_txt_path)
             else:
                 logger.info("=== Skip LLM Correction ===")
+                # Nothing edits the segments, so keep them column-oriented for the SRT writer
+                segments = SegmentBatch.from_whisper(transcription)
+                # Pre- and post-LLM text are identical: serialize once, copy the second path
+                self._write_segments_txt(segments, pre_txt_path)
+                self._copy_text_file(pre_txt_path, post_txt_path)
+                result_paths['pre_llm_txt'] = pre_txt_path
 
-            # Write post-LLM plain text (will equal pre-LLM if correction skipped)
-            post_txt_path = os.path.join(output_dir, f"{base_name}_post_llm.txt")
-            self._write_segments_txt(segments, post_txt_path)
             result_paths['post_llm_txt'] = post_txt_path
 
             # Step 4: Generate SRT subtitles
             logger.info("=== Step 4: Generate SRT Subtitles ===")
-            srt_path = os.path.join(output_dir, f"{base_name}.srt")
+            srt_path = str(out_dir / f"{base_name}.srt")
             srt_path = self.subtitle_generator.generate_srt(segments, srt_path)
             result_paths['srt'] = srt_path
 
@@ -139,6 +232,63 @@ class VideoProcessor:
             logger.error(f"Video processing failed: {str(e)}")
             raise
 
+    def _process_streaming(self,
+                           audio,
+                           language: str,
+                           out_dir: Path,
+                           base_name: str,
+                           result_paths: Dict[str, str]) -> Dict[str, str]:
+        """Transcribe and write NDJSON, text and SRT outputs in a single pass over the segments"""
+        workers = self.config.whisper.parallel_workers
+        word_timestamps = self.config.whisper.word_timestamps
+        if workers > 1:
+            transcription = self.transcriber.transcribe_audio_parallel(
+                audio, language, workers=workers, word_timestamps=word_timestamps
+            )
+            raw_segments = iter(transcription['segments'])
+        else:
+            raw_segments, _ = self.transcriber.transcribe_stream(audio, language, word_timestamps)
+
+        transcription_path = str(out_dir / f"{base_name}_transcription.ndjson")
+        pre_txt_path = str(out_dir / f"{base_name}_pre_llm.txt")
+        post_txt_path = str(out_dir / f"{base_name}_post_llm.txt")
+        srt_path = str(out_dir / f"{base_name}.srt")
+
+        head: List[Dict] = []
+        count = 0
+
+        def watch(segments: Iterable[Dict]) -> Iterator[Dict]:
+            # Keep only the first few segments for the preview
+            nonlocal count
+            for seg in segments:
+                if len(head) < 5:
+                    head.append(seg)
+                count += 1
+                yield seg
+
+        logger.info("=== Skip LLM Correction ===")
+        logger.info("=== Step 4: Generate SRT Subtitles (streaming) ===")
+        raw_segments = self.transcriber.save_transcription_ndjson(raw_segments, transcription_path)
+        segments = self.transcriber.iter_segments({'segments': raw_segments})
+        segments = watch(self._tee_segments_txt(segments, pre_txt_path))
+        srt_path = self.subtitle_generator.write_srt_stream(segments, srt_path)
+        self._copy_text_file(pre_txt_path, post_txt_path)
+
+        result_paths['transcription'] = transcription_path
+        result_paths['pre_llm_txt'] = pre_txt_path
+        result_paths['post_llm_txt'] = post_txt_path
+        result_paths['srt'] = srt_path
+
+        preview = self.subtitle_generator.preview_subtitles(head, total=count)
+        logger.info(f"\n{preview}")
+
+        if self.subtitle_generator.validate_srt(srt_path):
+            logger.info("✅ Subtitle generation complete!")
+        else:
+            logger.warning("⚠️ SRT file may have issues")
+
+        return result_paths
+
     def get_video_info(self, video_path: str) -> Dict:
         """Get video information"""
         return self.audio_extractor.get_video_info(video_path)
@@ -153,8 +303,9 @@ class VideoProcessor:
         """
         files_to_remove = []
 
-        if not keep_audio and 'audio' in result_paths:
-            files_to_remove.append(result_paths['audio'])
+        if not keep_audio:
+            # The decoded-waveform cache is only useful alongside the WAV it was decoded from
+            files_to_remove.extend(result_paths[key] for key in ('audio', 'decoded_audio') if key in result_paths)
 
         if 'transcription' in result_paths:
             files_to_remove.append(result_paths['transcription'])
@@ -1,66 +1,283 @@
 """
 Whisper Transcriber - Convert audio to text using OpenAI Whisper
+Supports the reference openai-whisper backend, faster-whisper (CTranslate2)
+and whisper.cpp (pywhispercpp)
 """
 
 import os
-import json
+import hashlib
 import logging
-import whisper
-from typing import List, Dict, Optional
+import subprocess
+import threading
+import numpy as np
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from config.settings import get_env
+from utils import json_dumps
+from .audio_extractor import WHISPER_SAMPLE_RATE
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_BACKENDS = ("faster-whisper", "openai", "whisper.cpp")
+
+# Loaded models shared across transcribers, least recently used first,
+# keyed by (backend, model_name, device, compute_type, num_workers, quantization)
+_MODEL_CACHE: "OrderedDict[Tuple[str, str, str, str, int, bool], Any]" = OrderedDict()
+_MODEL_CACHE_LOCK = threading.Lock()
+# Models can take GBs each, so keep only a couple resident
+MODEL_CACHE_SIZE = 2
+
+# Frame length (samples) used to find low-energy split points: 20 ms at 16 kHz
+_SPLIT_FRAME = 320
+# How far back from a chunk boundary to search for the quietest frame, in seconds
+_SPLIT_SEARCH_SECONDS = 5.0
+
+def clear_model_cache():
+    """Drop all cached Whisper models (transcribers that hold one keep it until released)"""
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+
+@lru_cache(maxsize=None)
+def _decoder_fingerprint(backend: str) -> str:
+    """Short hash of the audio decoder version, so cached waveforms are redone when it changes"""
+    if backend == "faster-whisper":
+        import av
+
+        version = f"pyav-{av.__version__}"
+    else:
+        try:
+            output = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True).stdout
+            version = output.splitlines()[0]
+        except (OSError, subprocess.CalledProcessError, IndexError):
+            version = "ffmpeg-unknown"
+    return hashlib.sha1(version.encode('utf-8')).hexdigest()[:8]
+
 class WhisperTranscriber:
     """Use Whisper model for speech-to-text conversion"""
 
-    def __init__(self, model_name: str = "base"):
+    # openai-whisper module, imported on first use so startup does not pay for whisper/torch
+    _whisper = None
+    # Silero VAD model shared by the backends without built-in VAD
+    _vad_model = None
+
+    def __init__(self,
+                 model_name: str = "base",
+                 backend: str = "faster-whisper",
+                 compute_type: str = "auto",
+                 device: Optional[str] = None,
+                 fp16: bool = True,
+                 enable_model_cache: bool = True,
+                 num_workers: int = 1,
+                 quantization: bool = False,
+                 vad_filter: bool = True,
+                 vad_min_silence_ms: int = 500,
+                 cache_decoded_audio: bool = False):
         """
         Initialize Whisper transcriber
 
         Args:
             model_name: Whisper model name (tiny, base, small, medium, large)
+            backend: Inference backend ("faster-whisper", "openai" or "whisper.cpp")
+            compute_type: CTranslate2 compute type for faster-whisper (int8, int8_float16,
+                float16, ...); "auto" picks int8_float16 on CUDA and int8 on CPU
+            device: Inference device ("cpu" or "cuda"); None selects CUDA when available
+            fp16: Use half precision on CUDA with the openai backend
+            enable_model_cache: Reuse an already loaded model with the same settings
+            num_workers: Concurrent transcriptions supported by a faster-whisper model
+            quantization: INT8-quantize the openai backend's linear layers on CPU
+                (faster-whisper quantizes through compute_type)
+            vad_filter: Only decode speech regions found by Silero VAD
+            vad_min_silence_ms: Minimum silence length that splits speech regions
+            cache_decoded_audio: Keep decoded waveforms next to audio files as .npy
+                so repeated transcriptions skip decoding
         """
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unsupported Whisper backend: {backend}")
+
         self.model_name = model_name
+        self.backend = backend
+        self.compute_type = compute_type
+        self.device = device
+        self.fp16 = fp16
+        self.enable_model_cache = enable_model_cache
+        self.num_workers = max(1, num_workers)
+        self.quantization = quantization
+        self.vad_filter = vad_filter
+        self.vad_min_silence_ms = vad_min_silence_ms
+        self.cache_decoded_audio = cache_decoded_audio
         self.model = None
+        if self.vad_filter and backend != "faster-whisper":
+            # Settle VAD before the (much slower) model load, so a missing silero-vad fails over first
+            self._load_vad_model()
         self.load_model()
 
+    @classmethod
+    def from_cache(cls, model_name: str = "base", **kwargs) -> 'WhisperTranscriber':
+        """
+        Create a transcriber that reuses a cached model when one is already loaded
+
+        Args:
+            model_name: Whisper model name
+            **kwargs: Other WhisperTranscriber arguments
+
+        Returns:
+            WhisperTranscriber: Transcriber instance
+        """
+        kwargs['enable_model_cache'] = True
+        return cls(model_name, **kwargs)
+
+    @classmethod
+    def _import_whisper(cls):
+        """Import openai-whisper once and cache the module on the class"""
+        if cls._whisper is None:
+            import whisper
+
+            cls._whisper = whisper
+        return cls._whisper
+
     def load_model(self):
         """Load Whisper model"""
         try:
-            logger.info(f"Loading Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name)
-            logger.info("Whisper model loaded successfully")
+            self.device = self.device or self._detect_device()
+            cache_key = (self.backend, self.model_name, self.device, self.compute_type,
+                         self.num_workers, self.quantization)
+            cached = None
+            if self.enable_model_cache:
+                with _MODEL_CACHE_LOCK:
+                    cached = _MODEL_CACHE.get(cache_key)
+                    if cached is not None:
+                        _MODEL_CACHE.move_to_end(cache_key)
+            if cached is not None:
+                self.model = cached
+                logger.info(f"Reusing cached Whisper model: {self.model_name} ({self.backend}, {self.device})")
+                return
+
+            logger.info(f"Loading Whisper model: {self.model_name} ({self.backend})")
+            # Shared download location so repeated CLI runs reuse the same weights on disk
+            download_root = get_env("WHISPER_CACHE_DIR")
+            if download_root:
+                download_root = os.path.expanduser(download_root)
+            if self.backend == "faster-whisper":
+                from faster_whisper import WhisperModel
+
+                compute_type = self.compute_type
+                if compute_type == "auto":
+                    compute_type = "int8_float16" if self.device == "cuda" else "int8"
+                self.model = WhisperModel(
+                    self.model_name,
+                    device=self.device,
+                    compute_type=compute_type,
+                    num_workers=self.num_workers,
+                    download_root=download_root
+                )
+            elif self.backend == "whisper.cpp":
+                from pywhispercpp.model import Model
+
+                # Beam search sampling; batched beams share whisper.cpp's unified KV cache
+                self.model = Model(self.model_name, models_dir=download_root, params_sampling_strategy=1)
+            else:
+                whisper = self._import_whisper()
+                self.model = whisper.load_model(self.model_name, device=self.device, download_root=download_root)
+                if self.quantization:
+                    self.model = self._quantize_model(self.model)
+
+            if self.enable_model_cache:
+                with _MODEL_CACHE_LOCK:
+                    _MODEL_CACHE[cache_key] = self.model
+                    _MODEL_CACHE.move_to_end(cache_key)
+                    while len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+                        _MODEL_CACHE.popitem(last=False)
+            logger.info(f"Whisper model loaded successfully on {self.device}")
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {str(e)}")
             raise
 
-    def transcribe_audio(self, audio_path: str, language: str = "zh") -> Dict:
+    def _quantize_model(self, model):
+        """Apply dynamic INT8 quantization to the linear layers of an openai-whisper model"""
+        if self.device != "cpu":
+            logger.warning("Dynamic INT8 quantization only runs on CPU; keeping the unquantized model")
+            return model
+
+        import torch
+        from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+        from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+
+        class WhisperDynamicLinear(DynamicLinear):
+            """Dynamic INT8 Linear built from openai-whisper's Linear subclass"""
+
+            @classmethod
+            def from_float(cls, mod, **kwargs):
+                # DynamicLinear.from_float only accepts exact nn.Linear types
+                linear = torch.nn.Linear(mod.in_features, mod.out_features, bias=mod.bias is not None, device="meta")
+                linear.weight = mod.weight
+                linear.bias = mod.bias
+                linear.qconfig = mod.qconfig
+                return DynamicLinear.from_float(linear, **kwargs)
+
+        # quantize_dynamic matches exact module types, and openai-whisper subclasses nn.Linear
+        whisper_linear = self._import_whisper().model.Linear
+        quantized = quantize_dynamic(
+            model,
+            qconfig_spec={torch.nn.Linear: default_dynamic_qconfig, whisper_linear: default_dynamic_qconfig},
+            mapping={torch.nn.Linear: DynamicLinear, whisper_linear: WhisperDynamicLinear},
+            dtype=torch.qint8
+        )
+
+        swapped = sum(isinstance(module, DynamicLinear) for module in quantized.modules())
+        if swapped:
+            logger.info(f"Quantized {swapped} Whisper linear layers to INT8")
+        else:
+            logger.warning("No Whisper linear layers were quantized")
+        return quantized
+
+    def _detect_device(self) -> str:
+        """Select CUDA when the backend can use it, otherwise CPU"""
+        if self.backend == "whisper.cpp":
+            # GPU offload is fixed when whisper.cpp is built (e.g. WHISPER_CUBLAS=1)
+            return "auto"
+
+        if self.backend == "faster-whisper":
+            import ctranslate2
+
+            return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+        import torch
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    def transcribe_audio(self,
+                         audio_path: Union[str, np.ndarray],
+                         language: str = "zh",
+                         word_timestamps: bool = False) -> Dict:
         """
         Transcribe audio to text
 
         Args:
-            audio_path: Audio file path
+            audio_path: Audio file path, or a float32 16 kHz mono waveform
             language: Language code (zh, en, ja, etc.)
+            word_timestamps: Also align word-level timestamps (extra decoder pass)
 
         Returns:
             Dict: Dictionary containing transcription results
         """
-        if not os.path.exists(audio_path):
+        if isinstance(audio_path, str) and not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         if self.model is None:
             raise RuntimeError("Whisper model not loaded")
 
         try:
-            logger.info(f"Starting audio transcription: {audio_path}")
+            if isinstance(audio_path, str):
+                logger.info(f"Starting audio transcription: {audio_path}")
+            else:
+                logger.info(f"Starting audio transcription: {len(audio_path)} in-memory samples")
 
             # Use Whisper for transcription
-            result = self.model.transcribe(
-                audio_path,
-                language=language,
-                word_timestamps=True,
-                verbose=False
-            )
+            result = self._run_model(self._resolve_audio(audio_path), language, word_timestamps)
 
             logger.info(f"Transcription complete, {len(result['segments'])} segments")
             return result
@@ -69,28 +286,385 @@ class WhisperTranscriber:
             logger.error(f"Audio transcription failed: {str(e)}")
             raise
 
-    def extract_segments(self, transcription_result: Dict) -> List[Dict]:
+    def transcribe_stream(self,
+                          audio_path: Union[str, np.ndarray],
+                          language: str = "zh",
+                          word_timestamps: bool = False) -> Tuple[Iterator[Dict], Dict]:
         """
-        Extract segment information from transcription results
+        Transcribe audio, yielding segments as they are decoded
+
+        Only faster-whisper decodes lazily; the other backends transcribe the
+        whole input first and then iterate over the result.
 
         Args:
-            transcription_result: Whisper transcription results
+            audio_path: Audio file path, or a float32 16 kHz mono waveform
+            language: Language code (zh, en, ja, etc.)
+            word_timestamps: Also align word-level timestamps (extra decoder pass)
 
         Returns:
-            List[Dict]: List of segment information
+            Tuple[Iterator[Dict], Dict]: Segment iterator (transcription result schema)
+                and metadata containing the detected language
+        """
+        if isinstance(audio_path, str) and not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        if self.model is None:
+            raise RuntimeError("Whisper model not loaded")
+
+        try:
+            logger.info("Starting streaming audio transcription")
+            audio = self._resolve_audio(audio_path)
+            if self.backend == "faster-whisper":
+                segments, info = self._iter_faster_whisper(audio, language, word_timestamps)
+                return segments, {'language': info.language}
+
+            result = self._run_model(audio, language, word_timestamps)
+            return iter(result['segments']), {'language': result.get('language')}
+
+        except Exception as e:
+            logger.error(f"Audio transcription failed: {str(e)}")
+            raise
+
+    def transcribe_audio_parallel(self,
+                                  audio_path: Union[str, np.ndarray],
+                                  language: str = "zh",
+                                  chunk_seconds: float = 30.0,
+                                  workers: Optional[int] = None,
+                                  word_timestamps: bool = False) -> Dict:
+        """
+        Transcribe audio in silence-aligned chunks decoded concurrently
+
+        The waveform is cut into ~``chunk_seconds`` pieces at the quietest
+        point before each boundary; chunk timestamps are shifted back to the
+        global timeline and segment ids renumbered, so the result has the same
+        schema as ``transcribe_audio``.
+
+        Args:
+            audio_path: Audio file path, or a float32 16 kHz mono waveform
+            language: Language code (zh, en, ja, etc.)
+            chunk_seconds: Target chunk length in seconds
+            workers: Number of concurrent chunks (default: CPU count)
+            word_timestamps: Also align word-level timestamps (extra decoder pass)
+
+        Returns:
+            Dict: Dictionary containing transcription results
         """
+        if isinstance(audio_path, str) and not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        if self.model is None:
+            raise RuntimeError("Whisper model not loaded")
+
+        try:
+            audio = self._resolve_audio(audio_path)
+            if isinstance(audio, str):
+                audio = self._load_waveform(audio)
+            spans = self._split_on_silence(audio, chunk_seconds)
+            chunks = [audio[start:end] for start, end in spans]
+            workers = workers or os.cpu_count() or 1
+            logger.info(f"Starting parallel audio transcription: {len(chunks)} chunks, {workers} workers")
+
+            if self.backend == "faster-whisper" and workers > 1 and len(chunks) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(lambda chunk: self._run_model(chunk, language, word_timestamps), chunks))
+            else:
+                if workers > 1 and self.backend != "faster-whisper":
+                    # openai-whisper installs KV-cache hooks on the shared model per decode
+                    logger.warning("Concurrent decoding requires the faster-whisper backend; "
+                                   "transcribing chunks sequentially")
+                results = [self._run_model(chunk, language, word_timestamps) for chunk in chunks]
+
+            result = self._merge_chunk_results(results, [start / WHISPER_SAMPLE_RATE for start, _ in spans])
+            logger.info(f"Transcription complete, {len(result['segments'])} segments")
+            return result
+
+        except Exception as e:
+            logger.error(f"Audio transcription failed: {str(e)}")
+            raise
+
+    def _run_model(self, audio: Union[str, np.ndarray], language: str, word_timestamps: bool = False) -> Dict:
+        """Run the loaded backend on a path or waveform"""
+        if self.backend == "faster-whisper":
+            return self._transcribe_faster_whisper(audio, language, word_timestamps)
+        if self.vad_filter:
+            return self._transcribe_speech_only(audio, language, word_timestamps)
+        return self._decode(audio, language, word_timestamps)
+
+    def _decode(self, audio: Union[str, np.ndarray], language: str, word_timestamps: bool = False) -> Dict:
+        """Run the openai or whisper.cpp backend on a path or waveform"""
+        if self.backend == "whisper.cpp":
+            return self._transcribe_whisper_cpp(audio, language)
+        return self.model.transcribe(
+            audio,
+            language=language,
+            word_timestamps=word_timestamps,
+            verbose=False,
+            fp16=self.fp16 and self.device.startswith("cuda")
+        )
+
+    def _transcribe_speech_only(self,
+                                audio: Union[str, np.ndarray],
+                                language: str,
+                                word_timestamps: bool = False) -> Dict:
+        """Decode only the VAD speech regions, concatenated, and map timestamps back"""
+        waveform = self._load_waveform(audio) if isinstance(audio, str) else audio
+        spans = self._detect_speech(waveform)
+        if spans is None:
+            return self._decode(waveform, language, word_timestamps)
+        if not spans:
+            return {'text': '', 'segments': [], 'language': language}
+
+        speech = np.concatenate([waveform[start:end] for start, end in spans])
+        logger.info(f"VAD kept {len(speech) / WHISPER_SAMPLE_RATE:.1f}s of speech "
+                    f"out of {len(waveform) / WHISPER_SAMPLE_RATE:.1f}s")
+        result = self._decode(speech, language, word_timestamps)
+        self._restore_vad_timestamps(result, spans)
+        return result
+
+    def _load_vad_model(self):
+        """Load the shared Silero VAD model, disabling VAD when silero-vad is not installed"""
+        if WhisperTranscriber._vad_model is None:
+            try:
+                from silero_vad import load_silero_vad
+            except ImportError:
+                logger.warning("silero-vad is not installed; transcribing without VAD")
+                self.vad_filter = False
+                return None
+
+            WhisperTranscriber._vad_model = load_silero_vad()
+        return WhisperTranscriber._vad_model
+
+    def _detect_speech(self, waveform: np.ndarray) -> Optional[List[Tuple[int, int]]]:
+        """Speech regions as (start, end) sample spans, or None when Silero VAD is unavailable"""
+        vad_model = self._load_vad_model()
+        if vad_model is None:
+            return None
+
+        import torch
+        from silero_vad import get_speech_timestamps
+
+        timestamps = get_speech_timestamps(
+            torch.from_numpy(np.ascontiguousarray(waveform, dtype=np.float32)),
+            vad_model,
+            sampling_rate=WHISPER_SAMPLE_RATE,
+            min_silence_duration_ms=self.vad_min_silence_ms
+        )
+        return [(stamp['start'], stamp['end']) for stamp in timestamps]
+
+    def _restore_vad_timestamps(self, result: Dict, spans: List[Tuple[int, int]]):
+        """Shift timestamps from the concatenated speech back onto the original timeline"""
+        # Start of each span within the concatenated audio, and its shift to the original position
+        speech_starts = []
+        shifts = []
+        position = 0
+        for start, end in spans:
+            speech_starts.append(position / WHISPER_SAMPLE_RATE)
+            shifts.append((start - position) / WHISPER_SAMPLE_RATE)
+            position += end - start
+
+        def restore(seconds: float, is_end: bool = False) -> float:
+            # An end time exactly on a span boundary belongs to the span before it
+            index = (bisect_left if is_end else bisect_right)(speech_starts, seconds) - 1
+            return seconds + shifts[max(index, 0)]
+
+        for segment in result.get('segments', []):
+            segment['start'] = restore(segment['start'])
+            segment['end'] = restore(segment['end'], is_end=True)
+            for word in segment.get('words') or []:
+                word['start'] = restore(word['start'])
+                word['end'] = restore(word['end'], is_end=True)
+
+    def _resolve_audio(self, audio: Union[str, np.ndarray]) -> Union[str, np.ndarray]:
+        """Swap an audio path for its cached decoded waveform when caching is enabled"""
+        if isinstance(audio, str) and self.cache_decoded_audio:
+            return self._load_cached_waveform(audio)
+        return audio
+
+    def decoded_audio_cache_path(self, audio_path: str) -> str:
+        """Path of the decoded waveform cached next to an audio file"""
+        return f"{audio_path}.{_decoder_fingerprint(self.backend)}.f32.16k.npy"
+
+    def _load_cached_waveform(self, audio_path: str) -> np.ndarray:
+        """Load the decoded waveform cached next to an audio file, decoding and caching it on a miss"""
+        cache_path = self.decoded_audio_cache_path(audio_path)
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(audio_path):
+                logger.info(f"Using cached decoded audio: {cache_path}")
+                # Copy-on-write mapping: pages load lazily and the array stays writable for torch
+                return np.load(cache_path, mmap_mode='c')
+        except (OSError, ValueError):
+            pass
+
+        audio = np.asarray(self._load_waveform(audio_path), dtype=np.float32)
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, audio)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache decoded audio {cache_path}: {str(e)}")
+        return audio
+
+    def _load_waveform(self, audio_path: str) -> np.ndarray:
+        """Decode an audio file to a float32 16 kHz mono waveform"""
+        if self.backend == "faster-whisper":
+            from faster_whisper import decode_audio
+
+            return decode_audio(audio_path, sampling_rate=WHISPER_SAMPLE_RATE)
+        return self._import_whisper().load_audio(audio_path)
+
+    def _split_on_silence(self, audio: np.ndarray, chunk_seconds: float) -> List[Tuple[int, int]]:
+        """Split a waveform into (start, end) sample spans cut at low-energy frames"""
+        total = len(audio)
+        chunk = max(int(chunk_seconds * WHISPER_SAMPLE_RATE), WHISPER_SAMPLE_RATE)
+        if total <= chunk:
+            return [(0, total)]
+
+        # Per-frame energy computed once for the whole waveform
+        n_frames = total // _SPLIT_FRAME
+        frames = audio[:n_frames * _SPLIT_FRAME].reshape(n_frames, _SPLIT_FRAME)
+        energy = np.square(frames, dtype=np.float32).mean(axis=1)
+        search = int(_SPLIT_SEARCH_SECONDS * WHISPER_SAMPLE_RATE) // _SPLIT_FRAME
+
+        spans = []
+        start = 0
+        while total - start > chunk:
+            target = (start + chunk) // _SPLIT_FRAME
+            low = max(start // _SPLIT_FRAME + 1, target - search)
+            cut = (low + int(np.argmin(energy[low:target + 1]))) * _SPLIT_FRAME
+            spans.append((start, cut))
+            start = cut
+        spans.append((start, total))
+        return spans
+
+    def _merge_chunk_results(self, results: List[Dict], offsets: List[float]) -> Dict:
+        """Concatenate per-chunk results, shifting timestamps by each chunk's offset"""
         segments = []
+        for result, offset in zip(results, offsets):
+            for segment in result.get('segments', []):
+                segment['id'] = len(segments)
+                segment['start'] += offset
+                segment['end'] += offset
+                if 'seek' in segment:
+                    # seek is counted in 10 ms mel frames
+                    segment['seek'] += int(round(offset * 100))
+                for word in segment.get('words') or []:
+                    word['start'] += offset
+                    word['end'] += offset
+                segments.append(segment)
+
+        return {
+            'text': "".join(result.get('text', '') for result in results),
+            'segments': segments,
+            'language': results[0].get('language') if results else None
+        }
 
-        for segment in transcription_result.get('segments', []):
-            segment_info = {
-                'start': segment.get('start', 0),
-                'end': segment.get('end', 0),
-                'text': segment.get('text', '').strip(),
-                'id': segment.get('id', 0)
+    def _transcribe_faster_whisper(self,
+                                   audio: Union[str, np.ndarray],
+                                   language: str,
+                                   word_timestamps: bool = False) -> Dict:
+        """Run faster-whisper and convert its output to the openai-whisper result schema"""
+        segments_iter, info = self._iter_faster_whisper(audio, language, word_timestamps)
+        segments = list(segments_iter)
+
+        return {
+            'text': "".join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': info.language
+        }
+
+    def _iter_faster_whisper(self,
+                             audio: Union[str, np.ndarray],
+                             language: str,
+                             word_timestamps: bool = False) -> Tuple[Iterator[Dict], Any]:
+        """Start faster-whisper and lazily convert its segments as they are decoded"""
+        segments_iter, info = self.model.transcribe(
+            audio,
+            language=language,
+            word_timestamps=word_timestamps,
+            beam_size=5,
+            vad_filter=self.vad_filter,
+            vad_parameters={'min_silence_duration_ms': self.vad_min_silence_ms}
+        )
+
+        converted = (
+            {
+                'id': index,
+                'seek': segment.seek,
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text,
+                'tokens': list(segment.tokens),
+                'temperature': segment.temperature,
+                'avg_logprob': segment.avg_logprob,
+                'compression_ratio': segment.compression_ratio,
+                'no_speech_prob': segment.no_speech_prob,
+                'words': [
+                    {'word': word.word, 'start': word.start, 'end': word.end, 'probability': word.probability}
+                    for word in (segment.words or [])
+                ]
             }
-            segments.append(segment_info)
+            for index, segment in enumerate(segments_iter)
+        )
+        return converted, info
 
-        return segments
+    def _transcribe_whisper_cpp(self, audio: Union[str, np.ndarray], language: str) -> Dict:
+        """Run whisper.cpp and convert its segments to the openai-whisper result schema"""
+        cpp_segments = self.model.transcribe(
+            audio,
+            language=language,
+            # The model is loaded with beam search sampling, so greedy params would be ignored
+            beam_search={'beam_size': 5, 'patience': -1.0}
+        )
+
+        segments = []
+        for index, segment in enumerate(cpp_segments):
+            # whisper.cpp timestamps are in 10 ms units
+            segments.append({
+                'id': index,
+                'seek': segment.t0,
+                'start': segment.t0 / 100,
+                'end': segment.t1 / 100,
+                'text': segment.text,
+                'words': []
+            })
+
+        return {
+            'text': "".join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': language
+        }
+
+    def iter_segments(self, transcription_result: Dict) -> Iterator[Dict]:
+        """
+        Iterate over segment information from transcription results
+
+        Args:
+            transcription_result: Whisper transcription results
+
+        Yields:
+            Dict: Segment information
+        """
+        # Every backend sets these keys, so subscript directly
+        for segment in transcription_result['segments']:
+            yield {
+                'start': segment['start'],
+                'end': segment['end'],
+                'text': segment['text'].strip(),
+                'id': segment['id']
+            }
+
+    def extract_segments(self, transcription_result: Dict) -> List[Dict]:
+        """
+        Extract segment information from transcription results
+
+        Args:
+            transcription_result: Whisper transcription results
+
+        Returns:
+            List[Dict]: List of segment information
+        """
+        return list(self.iter_segments(transcription_result))
 
     def save_transcription(self, transcription_result: Dict, output_path: str):
         """
@@ -101,8 +675,33 @@ class WhisperTranscriber:
             output_path: Output file path
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(transcription_result, f, ensure_ascii=False, indent=2)
+            with open(output_path, 'wb') as f:
+                f.write(json_dumps(transcription_result))
+            logger.info(f"Transcription results saved: {output_path}")
+        except Exception as e:
+            logger.error(f"Failed to save transcription results: {str(e)}")
+            raise
+
+    def save_transcription_ndjson(self, segments: Iterable[Dict], output_path: str) -> Iterator[Dict]:
+        """
+        Save transcription segments as NDJSON while passing them through
+
+        One JSON line is appended per segment as it arrives, so the full
+        result never has to be held in memory.
+
+        Args:
+            segments: Transcription result segments
+            output_path: Output file path
+
+        Yields:
+            Dict: Each segment, after it has been written
+        """
+        try:
+            with open(output_path, 'wb') as f:
+                for segment in segments:
+                    f.write(json_dumps(segment, indent=False))
+                    f.write(b"\n")
+                    yield segment
             logger.info(f"Transcription results saved: {output_path}")
         except Exception as e:
             logger.error(f"Failed to save transcription results: {str(e)}")
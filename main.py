@@ -5,25 +5,38 @@ Automatic Video Subtitle Generation and Correction System
 
 import os
 import sys
+import atexit
+import queue
 import argparse
 import logging
+import logging.handlers
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-from core.video_processor import VideoProcessor
-from config.settings import AppConfig
+from config.settings import get_app_config
 
 def setup_logging(level: str = "INFO"):
-    """Setup logging configuration"""
+    """Setup logging configuration; handlers run on a background listener thread"""
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler('subtitle_generation.log', encoding='utf-8')
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # The queue handler only merges args into the message; the listener's handlers apply the format
     logging.basicConfig(
         level=getattr(logging, level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler('subtitle_generation.log', encoding='utf-8')
-        ]
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
     )
 
 def main():
@@ -61,6 +74,59 @@ Usage Examples:
         help="Whisper model size (default: base)"
     )
 
+    parser.add_argument(
+        "--backend",
+        default="faster-whisper",
+        choices=["faster-whisper", "openai", "whisper.cpp"],
+        help="Whisper inference backend (default: faster-whisper)"
+    )
+
+    parser.add_argument(
+        "--device",
+        default="auto",
+        choices=["auto", "cpu", "cuda"],
+        help="Inference device (default: auto, CUDA when available)"
+    )
+
+    parser.add_argument(
+        "--compute-type",
+        default="auto",
+        choices=["auto", "int8", "int8_float16", "float16", "float32"],
+        help="Whisper compute type; float32 also disables FP16 on the openai backend (default: auto)"
+    )
+
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="INT8-quantize the openai backend on CPU (faster-whisper: use --compute-type)"
+    )
+
+    parser.add_argument(
+        "--word-timestamps",
+        action="store_true",
+        help="Include word-level timestamps in the transcription JSON (slower)"
+    )
+
+    parser.add_argument(
+        "--no-vad",
+        action="store_true",
+        help="Decode the whole audio instead of only VAD-detected speech"
+    )
+
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Transcribe ~30s audio chunks with N concurrent workers (default: 0, disabled)"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write subtitles while transcribing, saving the transcription as NDJSON (ignored with LLM correction)"
+    )
+
     parser.add_argument(
         "--lang",
         default="zh",
@@ -86,6 +152,12 @@ Usage Examples:
         help="Keep temporary files"
     )
 
+    parser.add_argument(
+        "--cache-audio",
+        action="store_true",
+        help="With --keep-temp, reuse the extracted WAV and its decoded waveform on later runs"
+    )
+
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -95,6 +167,9 @@ Usage Examples:
 
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help does not load the Whisper/LLM stack
+    from core.video_processor import VideoProcessor
+
     # Setup logging
     setup_logging(args.log_level)
     logger = logging.getLogger(__name__)
@@ -106,19 +181,32 @@ Usage Examples:
             sys.exit(1)
 
         # Load configuration
-        config = AppConfig()
+        config = get_app_config()
+        # The API key lookup depends on the provider, so apply it before reading the environment
+        if config.llm.provider != args.provider:
+            config.llm.provider = args.provider
+            config.llm.api_key = None
         config.load_from_env()
 
         # Apply command line arguments
         config.whisper.model_name = args.model
+        config.whisper.backend = args.backend
+        config.whisper.device = None if args.device == "auto" else args.device
+        config.whisper.compute_type = args.compute_type
+        config.whisper.fp16 = args.compute_type != "float32"
+        config.whisper.parallel_workers = args.parallel
+        config.whisper.quantization = args.quantize
+        config.whisper.word_timestamps = args.word_timestamps
+        config.whisper.vad_filter = not args.no_vad
+        config.whisper.cache_decoded_audio = args.cache_audio
         config.whisper.language = args.lang
-        config.llm.provider = args.provider
         config.processing.enable_llm_correction = not args.no_correction
         config.processing.keep_temp_files = args.keep_temp
+        config.processing.stream_segments = args.stream
 
         logger.info("=== SubtitleLLM Automatic Subtitle Generation System ===")
         logger.info(f"Video file: {args.video_path}")
-        logger.info(f"Whisper model: {config.whisper.model_name}")
+        logger.info(f"Whisper model: {config.whisper.model_name} ({config.whisper.backend})")
         logger.info(f"Language: {config.whisper.language}")
         logger.info(f"LLM provider: {config.llm.provider}")
         logger.info(f"LLM correction: {'Enabled' if config.processing.enable_llm_correction else 'Disabled'}")
@@ -132,7 +220,8 @@ Usage Examples:
         processor = VideoProcessor(
             whisper_model=config.whisper.model_name,
             llm_provider=config.llm.provider,
-            llm_api_key=config.llm.api_key
+            llm_api_key=config.llm.api_key,
+            config=config
         )
 
         # Get video information
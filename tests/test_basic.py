@@ -3,10 +3,21 @@ Basic functionality tests
 """
 
 import unittest
+import importlib.util
 import os
 import tempfile
+from dataclasses import asdict
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import numpy as np
 from core.audio_extractor import AudioExtractor
-from core.subtitle_generator import SubtitleGenerator
+from core.subtitle_generator import SubtitleGenerator, _char_tables, _display_width
+from core.segments import SegmentBatch
+from core.llm_corrector import LLMCorrector, _get_gemini_model
+from core.whisper_transcriber import WhisperTranscriber, clear_model_cache
+from core.video_processor import VideoProcessor
+from config.settings import AppConfig, WhisperConfig, refresh_env, get_app_config, invalidate
+from utils import create_output_filename, json_dumps, json_loads, _text_jit
 
 class TestAudioExtractor(unittest.TestCase):
     """Test audio extractor"""
@@ -24,6 +35,43 @@ class TestAudioExtractor(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             self.extractor.extract_audio("non_existent_file.mp4")
 
+    def test_extract_audio_is_atomic(self):
+        """Test a failed extraction leaves no partial WAV behind"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video_path = os.path.join(tmp_dir, 'video.mp4')
+            audio_path = os.path.join(tmp_dir, 'video.wav')
+            open(video_path, 'w').close()
+
+            def fail(cmd):
+                open(cmd[-1], 'wb').close()
+                raise RuntimeError("ffmpeg exited with code 255")
+
+            with patch.object(self.extractor, '_run', side_effect=fail):
+                with self.assertRaises(RuntimeError):
+                    self.extractor.extract_audio(video_path, audio_path)
+            self.assertEqual(os.listdir(tmp_dir), ['video.mp4'])
+
+            with patch.object(self.extractor, '_run', side_effect=lambda cmd: open(cmd[-1], 'wb').close()):
+                self.assertEqual(self.extractor.extract_audio(video_path, audio_path), audio_path)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ['video.mp4', 'video.wav'])
+
+    def test_ffmpeg_input_is_not_an_option(self):
+        """Test ffmpeg runs without stdin and gets an absolute input path"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video_path = os.path.join(tmp_dir, '-video.mp4')
+            open(video_path, 'w').close()
+            cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                with patch.object(self.extractor, '_run', return_value=b'') as run:
+                    self.extractor.load_audio('-video.mp4')
+            finally:
+                os.chdir(cwd)
+
+        cmd = run.call_args[0][0]
+        self.assertIn("-nostdin", cmd)
+        self.assertEqual(os.path.realpath(cmd[cmd.index("-i") + 1]), os.path.realpath(video_path))
+
 class TestSubtitleGenerator(unittest.TestCase):
     """Test subtitle generator"""
 
@@ -33,15 +81,74 @@ class TestSubtitleGenerator(unittest.TestCase):
     def test_format_subtitle_text(self):
         """Test subtitle text formatting"""
         long_text = "This is a very long text that needs to be split into multiple lines to fit subtitle display requirements"
-        formatted = self.generator._format_subtitle_text(long_text)
-        lines = formatted.split('\n')
+        cues = self.generator._split_cues(long_text, 0.0, 4.0)
+        lines = [line for cue_text, _, _ in cues for line in cue_text.split('\n')]
 
         # Check that each line doesn't exceed the limit
         for line in lines:
             self.assertLessEqual(len(line), self.generator.max_chars_per_line)
 
-        # Check that number of lines doesn't exceed the limit
-        self.assertLessEqual(len(lines), self.generator.max_lines_per_subtitle)
+        # Check that number of lines per cue doesn't exceed the limit
+        for cue_text, _, _ in cues:
+            self.assertLessEqual(len(cue_text.split('\n')), self.generator.max_lines_per_subtitle)
+
+        # No word is dropped
+        self.assertEqual(" ".join(lines), long_text)
+
+    def test_format_subtitle_text_cjk(self):
+        """Test CJK text without spaces is wrapped by display width"""
+        text = "今天我們要來介紹一下這個新的產品，它的名字叫做字幕助手，非常好用。"
+        formatted = self.generator._format_subtitle_text(text)
+        lines = formatted.split('\n')
+
+        self.assertGreater(len(lines), self.generator.max_lines_per_subtitle)
+        for line in lines:
+            # Fullwidth characters occupy two columns
+            self.assertLessEqual(len(line) * 2, self.generator.max_chars_per_line)
+        self.assertEqual("".join(lines), "".join(text.split()))
+
+    def test_split_cues(self):
+        """Test overflowing text continues in extra cues with proportional timing"""
+        text = "今天我們要來介紹一下這個新的產品，它的名字叫做字幕助手，非常好用。"
+        cues = self.generator._split_cues(text, 10.0, 13.4)
+
+        self.assertEqual(len(cues), 2)
+        for cue_text, _, _ in cues:
+            self.assertLessEqual(len(cue_text.split('\n')), self.generator.max_lines_per_subtitle)
+        self.assertEqual("".join(cue_text.replace('\n', '') for cue_text, _, _ in cues), text)
+        self.assertEqual(cues[0][1], 10.0)
+        self.assertEqual(cues[0][2], cues[1][1])
+        self.assertAlmostEqual(cues[0][2], 10.0 + 3.4 * 31 / 33)
+        self.assertEqual(cues[-1][2], 13.4)
+
+    def test_format_subtitle_text_kernel(self):
+        """Test the wrap_lines kernel matches the Python line wrapping"""
+        texts = ["這是一個測試字幕，用來檢查換行是否正確。Mixed English words here",
+                 "one two three four five six seven eight nine ten eleven", "　字幕　", "",
+                 "今天我們要來介紹一下這個新的產品，它的名字叫做字幕助手，非常好用。"]
+        for text in texts:
+            with patch.object(self.generator, '_wrap_kernel', None):
+                expected = self.generator._format_subtitle_text(text)
+            self.assertEqual(self.generator._format_subtitle_text_jit(text), expected)
+
+    def test_char_tables(self):
+        """Test the code point tables match per-character classification"""
+        classes, widths = _char_tables()
+        for ch in " \u3000\t字あ한，。Aé":
+            cp = ord(ch)
+            self.assertEqual(bool(classes[cp] & _text_jit.WHITESPACE), ch.isspace())
+            self.assertEqual(bool(classes[cp] & _text_jit.CJK), ch in "字あ한")
+            self.assertEqual(bool(classes[cp] & _text_jit.PUNCT), ch in "\u3000，。")
+            self.assertEqual(widths[cp], _display_width(ch))
+
+    @unittest.skipUnless(importlib.util.find_spec("numba"), "numba not installed")
+    def test_format_subtitle_text_numba(self):
+        """Test the opt-in numba kernel matches the Python line wrapping"""
+        text = "這是一個測試字幕，用來檢查換行是否正確。Mixed English words here and more"
+        with patch.object(self.generator, '_wrap_kernel', None):
+            expected = self.generator._format_subtitle_text(text)
+        with patch.object(self.generator, '_wrap_kernel', _text_jit.load_wrap_lines(True)):
+            self.assertEqual(self.generator._format_subtitle_text(text), expected)
 
     def test_seconds_to_srt_time(self):
         """Test time format conversion"""
@@ -51,5 +158,382 @@ class TestSubtitleGenerator(unittest.TestCase):
         self.assertEqual(time_obj.seconds, 30)
         self.assertEqual(time_obj.milliseconds, 500)
 
+    def test_format_times_bulk(self):
+        """Test vectorized timestamp conversion"""
+        starts, ends = self.generator._format_times_bulk(
+            np.array([0.0, 59.9996, 3661.5]), np.array([1.25, 61.0, 3723.0])
+        )
+        self.assertEqual(starts, ["00:00:00,000", "00:01:00,000", "01:01:01,500"])
+        self.assertEqual(ends, ["00:00:01,250", "00:01:01,000", "01:02:03,000"])
+
+    def test_generate_srt(self):
+        """Test SRT file content and sequential numbering"""
+        segments = [
+            {'start': 0.0, 'end': 1.5, 'text': 'Hello world'},
+            {'start': 1.5, 'end': 2.0, 'text': '   '},
+            {'start': 3661.25, 'end': 3662.0, 'text': 'Second line'}
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            srt_path = os.path.join(tmp_dir, 'test.srt')
+            self.generator.generate_srt(segments, srt_path)
+            with open(srt_path, encoding='utf-8') as f:
+                content = f.read()
+
+        self.assertEqual(
+            content,
+            "1\n00:00:00,000 --> 00:00:01,500\nHello world\n\n"
+            "2\n01:01:01,250 --> 01:01:02,000\nSecond line\n\n"
+        )
+
+    def test_write_srt_stream(self):
+        """Test streamed SRT output matches generate_srt"""
+        segments = [
+            {'start': 0.0, 'end': 1.5, 'text': 'Hello world'},
+            {'start': 1.5, 'end': 2.0, 'text': ''},
+            {'start': 3661.25, 'end': 3662.0, 'text': '這是第二行字幕'}
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            srt_path = os.path.join(tmp_dir, 'test.srt')
+            stream_path = os.path.join(tmp_dir, 'stream.srt')
+            self.generator.generate_srt(segments, srt_path)
+            self.generator.write_srt_stream(iter(segments), stream_path)
+            with open(srt_path, encoding='utf-8') as f, open(stream_path, encoding='utf-8') as g:
+                self.assertEqual(g.read(), f.read())
+
+    def test_generate_srt_from_segment_batch(self):
+        """Test SegmentBatch round trip and SRT output"""
+        result = {'segments': [
+            {'id': 0, 'start': 0.0, 'end': 1.5, 'text': ' Hello world'},
+            {'id': 1, 'start': 1.5, 'end': 2.0, 'text': '   '},
+            {'id': 2, 'start': 3661.25, 'end': 3662.0, 'text': ' Second line'}
+        ]}
+        batch = SegmentBatch.from_whisper(result)
+        self.assertEqual(batch.to_list_of_dicts()[0], {'start': 0.0, 'end': 1.5, 'text': 'Hello world', 'id': 0})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            srt_path = os.path.join(tmp_dir, 'test.srt')
+            list_path = os.path.join(tmp_dir, 'list.srt')
+            self.generator.generate_srt(batch, srt_path)
+            self.generator.generate_srt(batch.to_list_of_dicts(), list_path)
+            with open(srt_path, encoding='utf-8') as f, open(list_path, encoding='utf-8') as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_validate_srt(self):
+        """Test SRT validation accepts generated files and rejects garbage"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            srt_path = os.path.join(tmp_dir, 'valid.srt')
+            self.generator.generate_srt([{'start': 0.0, 'end': 1.0, 'text': '你好'}], srt_path)
+            self.assertTrue(self.generator.validate_srt(srt_path))
+
+            bad_path = os.path.join(tmp_dir, 'invalid.srt')
+            with open(bad_path, 'w', encoding='utf-8') as f:
+                f.write("not a subtitle file\n")
+            self.assertFalse(self.generator.validate_srt(bad_path))
+
+            self.assertFalse(self.generator.validate_srt(os.path.join(tmp_dir, 'missing.srt')))
+
+class TestGeminiSetup(unittest.TestCase):
+    """Test Gemini SDK configuration"""
+
+    def test_gemini_configured_once_per_process(self):
+        """Test a second Gemini key is refused instead of silently sharing the first"""
+        genai = MagicMock()
+        modules = {'google': SimpleNamespace(generativeai=genai), 'google.generativeai': genai}
+        _get_gemini_model.cache_clear()
+        try:
+            with patch.dict('sys.modules', modules), patch('core.llm_corrector._gemini_api_key', None):
+                first = LLMCorrector("gemini", "key-a")
+                second = LLMCorrector("gemini", "key-a")
+                with self.assertRaises(ValueError):
+                    LLMCorrector("gemini", "key-b")
+        finally:
+            _get_gemini_model.cache_clear()
+
+        genai.configure.assert_called_once_with(api_key="key-a")
+        self.assertIs(first.model, second.model)
+
+class TestAppConfig(unittest.TestCase):
+    """Test application configuration"""
+
+    def tearDown(self):
+        os.environ.pop("WHISPER_LANGUAGE", None)
+        refresh_env()
+
+    def test_env_snapshot_refresh(self):
+        """Test environment snapshot is only re-read on refresh"""
+        os.environ["WHISPER_LANGUAGE"] = "ja"
+        refresh_env()
+        self.assertEqual(AppConfig().whisper.language, "ja")
+
+        os.environ["WHISPER_LANGUAGE"] = "en"
+        self.assertEqual(AppConfig().whisper.language, "ja")
+
+        refresh_env()
+        self.assertEqual(AppConfig().whisper.language, "en")
+
+    def test_get_app_config_cached(self):
+        """Test shared configuration is reused until invalidated"""
+        invalidate()
+        config = get_app_config()
+        self.assertIs(get_app_config(), config)
+
+        invalidate()
+        self.assertIsNot(get_app_config(), config)
+        invalidate()
+
+    def test_slotted_sections(self):
+        """Test configuration sections carry no per-instance __dict__"""
+        self.assertFalse(hasattr(WhisperConfig(), '__dict__'))
+        self.assertFalse(hasattr(AppConfig(), '__dict__'))
+
+    def test_to_dict_matches_asdict(self):
+        """Test hand-rolled to_dict covers every field"""
+        config = AppConfig()
+        self.assertEqual(config.to_dict(), asdict(config))
+
+    def test_from_file_legacy_format(self):
+        """Test loading legacy flat configuration keys"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_path = os.path.join(tmp_dir, 'config.json')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                f.write('{"language": "en", "enable_correction": false}')
+            config = AppConfig.from_file(config_path)
+
+        self.assertEqual(config.whisper.model_name, "base")
+        self.assertEqual(config.whisper.language, "en")
+        self.assertEqual(config.llm.provider, "openai")
+        self.assertFalse(config.processing.enable_llm_correction)
+
+class TestGroupedCorrection(unittest.TestCase):
+    """Test the grouped (numbered batch) LLM correction strategy"""
+
+    def setUp(self):
+        with patch.object(LLMCorrector, '_setup_client'):
+            self.corrector = LLMCorrector("openai", api_key="test", strategy="grouped", batch_size=10)
+
+    def test_parse_batch_response(self):
+        """Test numbered line parsing with mixed separators and stray lines"""
+        response = "Here you go:\n1: first\n2：second\n3、third\n5: out of range\n0: zero\n2: duplicate\nnot numbered"
+        self.assertEqual(
+            self.corrector._parse_batch_response(response, 4),
+            {0: "first", 1: "second", 2: "third"}
+        )
+
+    def test_missing_lines_retried_individually(self):
+        """Test lines missing from a batch response fall back to single-line prompts"""
+        calls = []
+
+        def fake_openai(prompt, max_tokens=200):
+            calls.append(prompt)
+            if "1: alpha one" in prompt:
+                # Batch reply: line 2 missing, line 1 given twice, an extra line 9
+                return "1: Alpha one.\n1: ignored\n3: Gamma three.\n9: extra"
+            return "Beta two."
+
+        segments = [{'text': "alpha one"}, {'text': "beta two"}, {'text': "gamma three"}, {'text': "ok"}]
+        with patch.object(self.corrector, '_correct_with_openai', side_effect=fake_openai):
+            corrected = self.corrector.correct_segments(segments, language="en")
+
+        self.assertEqual([seg['text'] for seg in corrected], ["Alpha one.", "Beta two.", "Gamma three.", "ok"])
+        self.assertEqual(len(calls), 2)
+        # The short "ok" segment is short-circuited and never enters the prompt
+        self.assertIn("Return all 3 lines", calls[0])
+        self.assertIn("3: gamma three", calls[0])
+        self.assertNotIn("4: ok", calls[0])
+
+    def test_correction_cache_is_lru(self):
+        """Test the correction cache evicts the least recently used entry"""
+        with patch('core.llm_corrector.CORRECTION_CACHE_SIZE', 2):
+            self.corrector._remember("first", "en", "First")
+            self.corrector._remember("second", "en", "Second")
+            self.assertEqual(self.corrector._short_circuit("first", "en").corrected_text, "First")
+            self.corrector._remember("third", "en", "Third")
+
+        self.assertIsNone(self.corrector._short_circuit("second", "en"))
+        self.assertEqual(self.corrector._short_circuit("first", "en").corrected_text, "First")
+
+    def test_group_failure_keeps_original_text(self):
+        """Test a failed batch request returns the original texts"""
+        segments = [{'text': "alpha one"}, {'text': "beta two"}]
+        with patch.object(self.corrector, '_correct_with_openai', side_effect=RuntimeError("boom")), \
+             self.assertLogs('core.llm_corrector', level='WARNING') as logs:
+            corrected = self.corrector.correct_segments(segments, language="zh")
+
+        self.assertEqual([seg['text'] for seg in corrected], ["alpha one", "beta two"])
+        self.assertEqual([seg['correction_confidence'] for seg in corrected], [0.0, 0.0])
+        self.assertIn("2/2 segments could not be corrected", logs.output[-1])
+
+class TestWhisperTranscriber(unittest.TestCase):
+    """Test Whisper transcriber helpers that do not need a loaded model"""
+
+    def setUp(self):
+        self.transcriber = WhisperTranscriber.__new__(WhisperTranscriber)
+        self.transcriber.backend = "openai"
+        self.transcriber.device = "cpu"
+
+    def test_model_cache_is_bounded_lru(self):
+        """Test loaded models are reused, the least recently used is evicted, and ~ is expanded"""
+        whisper = SimpleNamespace(load_model=MagicMock(side_effect=lambda name, **kwargs: object()))
+        clear_model_cache()
+        try:
+            with patch.object(WhisperTranscriber, '_import_whisper', return_value=whisper), \
+                 patch('core.whisper_transcriber.MODEL_CACHE_SIZE', 2), \
+                 patch('core.whisper_transcriber.get_env', return_value="~/whisper-models"):
+                def load(name):
+                    return WhisperTranscriber(name, backend="openai", device="cpu", vad_filter=False).model
+
+                tiny = load("tiny")
+                load("base")
+                self.assertIs(load("tiny"), tiny)
+                load("small")  # evicts base, the least recently used
+                self.assertIs(load("tiny"), tiny)
+                self.assertEqual(whisper.load_model.call_count, 3)
+                load("base")
+                self.assertEqual(whisper.load_model.call_count, 4)
+
+                self.assertEqual(whisper.load_model.call_args.kwargs['download_root'],
+                                 os.path.expanduser("~/whisper-models"))
+                clear_model_cache()
+                self.assertIsNot(load("tiny"), tiny)
+        finally:
+            clear_model_cache()
+
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "torch not installed")
+    def test_quantize_model_swaps_linear_subclass(self):
+        """Test dynamic quantization replaces openai-whisper's nn.Linear subclass"""
+        import torch
+        from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+
+        class Linear(torch.nn.Linear):
+            pass
+
+        whisper = SimpleNamespace(model=SimpleNamespace(Linear=Linear))
+        model = torch.nn.Sequential(Linear(8, 8), torch.nn.ReLU(), Linear(8, 4))
+        with patch.object(WhisperTranscriber, '_import_whisper', return_value=whisper):
+            quantized = self.transcriber._quantize_model(model)
+
+        self.assertIsInstance(quantized[0], DynamicLinear)
+        self.assertIsInstance(quantized[2], DynamicLinear)
+        inputs = torch.randn(3, 8)
+        self.assertTrue(torch.allclose(quantized(inputs), model(inputs), atol=0.1))
+
+    def test_missing_vad_fails_over_before_model_load(self):
+        """Test VAD is disabled before the model loads when silero-vad is not installed"""
+        vad_at_load = []
+        with patch.dict('sys.modules', {'silero_vad': None}), \
+             patch.object(WhisperTranscriber, '_vad_model', None), \
+             patch.object(WhisperTranscriber, 'load_model', autospec=True,
+                          side_effect=lambda transcriber: vad_at_load.append(transcriber.vad_filter)):
+            transcriber = WhisperTranscriber("base", backend="openai", device="cpu")
+
+        self.assertEqual(vad_at_load, [False])
+        self.assertFalse(transcriber.vad_filter)
+
+    def test_restore_vad_timestamps(self):
+        """Test VAD timestamps map back across span boundaries"""
+        # Speech at 1-2 s and 3-5 s of the original audio, concatenated to 0-3 s
+        spans = [(16000, 32000), (48000, 80000)]
+        result = {'segments': [
+            {'start': 0.5, 'end': 1.0, 'words': [{'start': 0.5, 'end': 1.0}]},
+            {'start': 1.0, 'end': 1.5, 'words': [{'start': 1.0, 'end': 1.2}, {'start': 1.2, 'end': 1.5}]},
+            {'start': 0.5, 'end': 2.0, 'words': None}
+        ]}
+        self.transcriber._restore_vad_timestamps(result, spans)
+        segments = result['segments']
+
+        # An end exactly on a boundary stays in the earlier span; a start on it moves to the later one
+        self.assertEqual((segments[0]['start'], segments[0]['end']), (1.5, 2.0))
+        self.assertEqual((segments[1]['start'], segments[1]['end']), (3.0, 3.5))
+        self.assertEqual([(w['start'], w['end']) for w in segments[0]['words']], [(1.5, 2.0)])
+        self.assertEqual([(w['start'], w['end']) for w in segments[1]['words']], [(3.0, 3.2), (3.2, 3.5)])
+        # A segment crossing spans keeps each endpoint in its own span
+        self.assertEqual((segments[2]['start'], segments[2]['end']), (1.5, 4.0))
+
+    def test_split_on_silence(self):
+        """Test chunks are cut at the quietest frame before each boundary"""
+        rate = 16000
+        audio = np.random.default_rng(0).normal(0, 0.1, 70 * rate).astype(np.float32)
+        audio[25 * rate:int(25.2 * rate)] = 0
+        audio[55 * rate:int(55.2 * rate)] = 0
+
+        spans = self.transcriber._split_on_silence(audio, 30)
+
+        self.assertEqual(spans, [(0, 25 * rate), (25 * rate, 55 * rate), (55 * rate, 70 * rate)])
+        self.assertEqual(self.transcriber._split_on_silence(audio[:10 * rate], 30), [(0, 10 * rate)])
+
+    def test_merge_chunk_results(self):
+        """Test merged chunk results are renumbered and shifted by their offsets"""
+        results = [
+            {'text': "a b", 'language': "en", 'segments': [
+                {'id': 0, 'seek': 0, 'start': 0.0, 'end': 1.0, 'text': "a"},
+                {'id': 1, 'seek': 0, 'start': 1.0, 'end': 2.0, 'text': "b"}
+            ]},
+            {'text': " c", 'language': "en", 'segments': [
+                {'id': 0, 'seek': 100, 'start': 0.5, 'end': 1.5, 'text': "c",
+                 'words': [{'start': 0.5, 'end': 1.5, 'word': "c"}]}
+            ]}
+        ]
+        merged = self.transcriber._merge_chunk_results(results, [0.0, 25.0])
+        segments = merged['segments']
+
+        self.assertEqual([seg['id'] for seg in segments], [0, 1, 2])
+        self.assertEqual([seg['seek'] for seg in segments], [0, 0, 2600])
+        self.assertEqual((segments[2]['start'], segments[2]['end']), (25.5, 26.5))
+        self.assertEqual((segments[2]['words'][0]['start'], segments[2]['words'][0]['end']), (25.5, 26.5))
+        self.assertEqual(merged['text'], "a b c")
+        self.assertEqual(merged['language'], "en")
+
+    def test_load_cached_waveform(self):
+        """Test a decoded waveform is cached once and reused while the audio is unchanged"""
+        waveform = np.linspace(-1, 1, 1600, dtype=np.float32)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            audio_path = os.path.join(tmp_dir, 'audio.wav')
+            open(audio_path, 'wb').close()
+            with patch.object(self.transcriber, '_load_waveform', return_value=waveform) as load:
+                first = self.transcriber._load_cached_waveform(audio_path)
+                second = self.transcriber._load_cached_waveform(audio_path)
+
+            self.assertEqual(load.call_count, 1)
+            self.assertTrue(os.path.exists(self.transcriber.decoded_audio_cache_path(audio_path)))
+            np.testing.assert_array_equal(first, waveform)
+            np.testing.assert_array_equal(second, waveform)
+            del first, second
+
+class TestVideoProcessor(unittest.TestCase):
+    """Test video processor file handling"""
+
+    def test_cleanup_removes_decoded_audio_cache(self):
+        """Test cleanup deletes the decoded-waveform cache with the WAV, and keeps both with keep_audio"""
+        processor = VideoProcessor.__new__(VideoProcessor)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result_paths = {key: os.path.join(tmp_dir, name) for key, name in (
+                ('audio', 'video.wav'), ('decoded_audio', 'video.wav.npy'), ('transcription', 'video.json')
+            )}
+            for path in result_paths.values():
+                open(path, 'w').close()
+
+            processor.cleanup_temp_files(result_paths, keep_audio=True)
+            self.assertTrue(os.path.exists(result_paths['audio']))
+            self.assertTrue(os.path.exists(result_paths['decoded_audio']))
+            self.assertFalse(os.path.exists(result_paths['transcription']))
+
+            processor.cleanup_temp_files(result_paths)
+            self.assertFalse(os.path.exists(result_paths['audio']))
+            self.assertFalse(os.path.exists(result_paths['decoded_audio']))
+
+class TestUtils(unittest.TestCase):
+    """Test utility functions"""
+
+    def test_json_dumps_numpy_values(self):
+        """Test serializing numpy values and non-string keys"""
+        data = {'start': np.float32(1.5), 'tokens': np.array([1, 2]), 1: "中文"}
+        self.assertEqual(json_loads(json_dumps(data)), {'start': 1.5, 'tokens': [1, 2], '1': "中文"})
+
+    def test_create_output_filename(self):
+        """Test output filenames, including paths without a stem"""
+        self.assertEqual(create_output_filename(os.path.join("videos", "clip.mp4"), "en", "srt"),
+                         os.path.join("videos", "clip_en.srt"))
+        self.assertEqual(create_output_filename("", "en", "srt"), "_en.srt")
+        self.assertEqual(create_output_filename("videos" + os.sep, "en", "srt"), os.path.join("videos", "_en.srt"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,10 +3,64 @@ Utility Functions - Common utility functions for the subtitle generation system
 """
 
 import os
+import sys
+import json
 import time
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Dict, Any
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional accelerator; fall back to stdlib json
+    orjson = None
+
+def json_loads(data: bytes) -> Any:
+    """
+    Parse JSON from raw bytes, using orjson when available
+
+    Args:
+        data: UTF-8 encoded JSON document
+
+    Returns:
+        Any: Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes, using orjson when available
+
+    numpy scalars and arrays and non-string dict keys are accepted.
+
+    Args:
+        obj: Object to serialize
+        indent: Indent by two spaces; False writes a single line (e.g. for NDJSON)
+
+    Returns:
+        bytes: UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        ensure_ascii=False,
+        separators=None if indent else (',', ':'),
+        default=_json_default
+    ).encode('utf-8')
+
+def _json_default(obj: Any) -> Any:
+    """Convert numpy scalars and arrays for the stdlib json fallback"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 def format_duration(seconds: float) -> str:
     """
     Format duration in seconds to readable time string
@@ -62,6 +116,15 @@ def create_output_filename(input_path: str, suffix: str, extension: str) -> str:
     base_name = os.path.splitext(os.path.basename(input_path))[0]
     return os.path.join(base_dir, f"{base_name}_{suffix}.{extension}")
 
+# Processing time per second of video for each Whisper model size
+_TIME_FACTORS = MappingProxyType({
+    "tiny": 0.1,
+    "base": 0.2,
+    "small": 0.4,
+    "medium": 0.8,
+    "large": 1.5
+})
+
 def estimate_processing_time(video_duration: float, model_size: str) -> float:
     """
     Estimate processing time based on video duration and model size
@@ -73,16 +136,7 @@ def estimate_processing_time(video_duration: float, model_size: str) -> float:
     Returns:
         float: Estimated processing time in seconds
     """
-    time_factors = {
-        "tiny": 0.1,
-        "base": 0.2,
-        "small": 0.4,
-        "medium": 0.8,
-        "large": 1.5
-    }
-
-    factor = time_factors.get(model_size, 0.5)
-    return video_duration * factor
+    return video_duration * _TIME_FACTORS.get(model_size, 0.5)
 
 def log_processing_stats(start_time: float, video_duration: float, segments_count: int):
     """
@@ -102,6 +156,9 @@ def log_processing_stats(start_time: float, video_duration: float, segments_coun
     print(f"Processing speed: {video_duration/processing_time:.1f}x realtime")
     print(f"Completion time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+# Minimum interval between progress redraws (~30 Hz)
+_PROGRESS_REFRESH_INTERVAL = 1 / 30
+
 class ProgressTracker:
     """Progress tracking utility class"""
 
@@ -109,17 +166,28 @@ class ProgressTracker:
         self.total_steps = total_steps
         self.current_step = 0
         self.start_time = time.time()
+        self._write = sys.stdout.write
+        self._flush = sys.stdout.flush
+        self._last = 0.0
 
     def update(self, step_name: str):
         """Update progress with step name"""
         self.current_step += 1
-        progress = (self.current_step / self.total_steps) * 100
-        elapsed = time.time() - self.start_time
+        finished = self.current_step == self.total_steps
 
-        print(f"\rProgress: {progress:.1f}% ({self.current_step}/{self.total_steps}) - {step_name}", end="", flush=True)
+        # Redraw at most ~30 times per second; the final step is always shown
+        now = time.monotonic()
+        if now - self._last < _PROGRESS_REFRESH_INTERVAL and not finished:
+            return
+        self._last = now
+
+        progress = (self.current_step / self.total_steps) * 100
+        self._write(f"\rProgress: {progress:5.1f}% ({self.current_step}/{self.total_steps}) - {step_name}")
 
-        if self.current_step == self.total_steps:
-            print(f"\n✅ All steps completed in {elapsed:.1f} seconds")
+        if finished:
+            elapsed = time.time() - self.start_time
+            self._write(f"\n✅ All steps completed in {elapsed:.1f} seconds\n")
+        self._flush()
 
     def finish(self):
         """Finish progress tracking"""
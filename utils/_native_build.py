@@ -0,0 +1,29 @@
+"""
+Ahead-of-time build of the subtitle layout kernels
+
+Run ``python -m utils._native_build`` to compile the ``utils.subtitle_native``
+extension module. With SUBTITLE_JIT=1, utils._text_jit uses it instead of
+JIT-compiling on first use; otherwise the pure-Python line wrapping is used.
+"""
+
+from pathlib import Path
+
+from numba import types
+from numba.pycc import CC
+
+from utils._text_jit import _wrap_lines
+
+cc = CC('subtitle_native')
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+# Code points come from np.frombuffer over the encoded text, so accept read-only buffers
+_wrap_lines_signature = types.Array(types.uint32, 1, 'C')(
+    types.Array(types.uint32, 1, 'C', readonly=True),
+    types.Array(types.uint8, 1, 'C'),
+    types.Array(types.int32, 1, 'C'),
+    types.int64
+)
+cc.export('wrap_lines', _wrap_lines_signature)(_wrap_lines)
+
+if __name__ == '__main__':
+    cc.compile()
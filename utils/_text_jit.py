@@ -0,0 +1,114 @@
+"""
+Compiled kernels for subtitle text layout
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# Character class flags; a character with no flag set belongs to a space-delimited word
+WHITESPACE = 1
+CJK = 2
+PUNCT = 4
+
+def _wrap_lines(codepoints, classes, widths, max_chars):
+    """
+    Tokenize and greedily pack text into lines by display width
+
+    Tokens are a CJK character or a word, each followed by any attached
+    punctuation; whitespace between tokens collapses to one space.
+
+    Args:
+        codepoints: uint32 code points of the text
+        classes: Class flags of each code point
+        widths: Display width of each code point
+        max_chars: Maximum display columns per line
+
+    Returns:
+        np.ndarray: uint32 code points of the wrapped text, lines separated by newlines
+    """
+    n = len(codepoints)
+    out = np.empty(2 * n + 1, dtype=np.uint32)
+    size = 0
+    current_len = 0
+    line_tokens = 0
+    i = 0
+
+    while i < n:
+        j = i
+        while j < n and classes[j] & WHITESPACE:
+            j += 1
+
+        if j == n:
+            # Only trailing whitespace left; an ideographic space in it still counts as punctuation
+            k = j - 1
+            while k >= i and not classes[k] & PUNCT:
+                k -= 1
+            if k < i:
+                break
+            start = k
+            end = k + 1
+        else:
+            start = j
+            end = j + 1
+            if classes[j] == 0:
+                while end < n and classes[end] == 0:
+                    end += 1
+            while end < n and classes[end] & PUNCT:
+                end += 1
+
+        spaced = line_tokens > 0 and start > i
+        width = 0
+        for c in range(start, end):
+            width += widths[c]
+        needed = width + 1 if spaced else width
+
+        if current_len + needed <= max_chars:
+            if spaced:
+                out[size] = 32
+                size += 1
+            current_len += needed
+            line_tokens += 1
+        else:
+            if line_tokens > 0:
+                out[size] = 10
+                size += 1
+            current_len = width
+            line_tokens = 1
+
+        for c in range(start, end):
+            out[size] = codepoints[c]
+            size += 1
+        i = end
+
+    return out[:size]
+
+@lru_cache(maxsize=None)
+def load_wrap_lines(enabled: bool = False):
+    """
+    Resolve a compiled wrap_lines kernel on first use
+
+    The kernel is opt-in: even the ahead-of-time build needs the character
+    tables built on first use, and only pays that back over thousands of
+    segments. When ``enabled``, the build from utils/_native_build.py is
+    used if it has been compiled, otherwise numba JIT-compiles the kernel.
+
+    Args:
+        enabled: Use a compiled kernel
+
+    Returns:
+        Compiled kernel, or None to use the Python implementation
+    """
+    if not enabled:
+        return None
+    try:
+        from .subtitle_native import wrap_lines
+        return wrap_lines
+    except ImportError:
+        pass
+
+    try:
+        from numba import njit
+    except ImportError:  # numba is an optional accelerator
+        return None
+    return njit(cache=True)(_wrap_lines)